@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+
+import pipeline
+import run_models
+from common.docx_reader import BLOCK_PARAGRAPH, iter_blocks
+from common.paragraphs import segment_paragraphs, split_numbering
+from common.constants import EXCEL_CHUNK_ROWS
+from common.workbooks import READERS, iter_frames, iter_sheets
+from parsers.doc import DocParser
+from parsers.pdf import ParserPDF
+from parsers.strategy import applicable_strategies, select_strategy
+
+
+@pytest.mark.parametrize("kind", ["single.xlsx", "multi.xlsx", "multi.xlsm", "multi.xls"])
+def bench_unified_excel_parser(benchmark, corpus_files, size, kind):
+    path = corpus_files(size, kind)
+
+    def parse():
+        parser = run_models.UnifiedExcelParser(path)
+        parser.process()
+        return parser.data
+
+    data = benchmark(parse)
+    assert len(data) == size
+
+
+@pytest.mark.parametrize("engine", list(READERS))
+@pytest.mark.parametrize("kind", ["single.xlsx", "multi.xlsx", "multi.xls"])
+def bench_excel_reader_engine(benchmark, corpus_files, size, kind, engine):
+    # Только чтение всех листов выбранным движком, без сегментации
+    path = corpus_files(size, kind)
+    if not READERS[engine].supports(path):
+        pytest.skip(f"{engine} не читает {path.suffix} или не установлен")
+
+    def read():
+        return sum(len(list(rows)) for _, rows in iter_sheets(path, engine=engine))
+
+    assert benchmark(read) > size
+
+
+def bench_iter_frames_widening(benchmark):
+    # Лист, который становится шире после первого куска: ячейки последней строки не теряются
+    rows = [["Светильник"]] * EXCEL_CHUNK_ROWS + [["Прожектор", "Мощность", "не более 50 Вт"]]
+
+    frames = benchmark(lambda: list(iter_frames(iter(rows))))
+    assert frames[-1].iloc[-1].tolist() == ["Прожектор", "Мощность", "не более 50 Вт"]
+
+
+@pytest.mark.parametrize("kind", ["numbered.docx", "named.docx", "rows.docx", "paragraphs.docx", "sections.docx"])
+def bench_uniqe_doc_strategy(benchmark, corpus_files, size, kind):
+    from parsers.word_d.uniqe_doc import UniqeDocStrategy
+
+    path = corpus_files(size, kind)
+    assert benchmark(UniqeDocStrategy().parse_file, path)
+
+
+@pytest.mark.parametrize("kind", ["paragraphs.docx", "sections.docx"])
+def bench_paragraph_segmentation(benchmark, corpus_files, size, kind):
+    # Свободный текст: одно описание на товар, заголовки разделов товарами не становятся
+    path = corpus_files(size, kind)
+    paragraphs = [block.text for block in iter_blocks(path) if block.kind == BLOCK_PARAGRAPH]
+
+    products = benchmark(lambda: list(segment_paragraphs(paragraphs)))
+    assert len(products) == size
+    assert not any(split_numbering(product.name)[0] == 1 for product in products)
+
+
+def bench_doc_parser(benchmark, corpus_files, size):
+    path = corpus_files(size, "rows.docx")
+    assert benchmark(DocParser, path) is not None
+
+
+def bench_niiar_strategy(benchmark, corpus_files, size):
+    from parsers.pdf_d.TZ_for_NIIAR import NiiarStrategy
+
+    path = corpus_files(size, "table.pdf")
+    assert benchmark(NiiarStrategy().parse_file, path)
+
+
+def bench_parser_pdf(benchmark, corpus_files, size):
+    path = corpus_files(size, "table.pdf")
+    assert benchmark(ParserPDF, path) is not None
+
+
+def bench_prose_pdf(benchmark, corpus_files, size):
+    # Текст договора без таблиц: ни одна стратегия PDF не находит в нём товаров
+    path = corpus_files(size, "prose.pdf")
+    strategies = applicable_strategies(path)
+
+    def parse():
+        return {strategy.name: strategy.parse_file(path) for strategy in strategies}
+
+    assert benchmark(parse) == {strategy.name: [] for strategy in strategies}
+
+
+@pytest.mark.parametrize("workers", [1, 0])
+@pytest.mark.parametrize("kind", ["multi.xlsx", "numbered.docx", "table.pdf"])
+def bench_strategy_selection(benchmark, corpus_files, size, kind, workers):
+    # Оценка всех подходящих стратегий на выборке: по очереди и в постоянном пуле процессов
+    path = corpus_files(size, kind)
+    strategies = applicable_strategies(path)
+    assert benchmark(select_strategy, path, strategies, workers) in strategies
+
+
+@pytest.mark.parametrize("kind", ["multi.xlsx", "rows.docx", "table.pdf"])
+def bench_pipeline_end_to_end(benchmark, corpus_files, stub_llm, tmp_path, size, kind):
+    # Парсинг -> извлечение (заглушка модели) -> запись книги
+    path = corpus_files(size, kind)
+    output_file = tmp_path / "result.xlsx"
+
+    def run():
+        parsed_products = pipeline.parse_products(path)
+        filled_forms = [pipeline.extract_product(product["text"]) for product in parsed_products]
+        df_form = pd.DataFrame(filled_forms, columns=pipeline.final_columns)
+        pipeline.save_output(df_form, output_file, pipeline.final_columns)
+        return len(filled_forms)
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+    assert output_file.exists()
@@ -0,0 +1,103 @@
+"""
+Бенчмарки парсеров и конвейера на синтетическом корпусе (bench/corpus.py) с заглушкой модели.
+
+Запуск из корня проекта:
+    python -m pytest bench                                  # размеры 10 и 100 товаров
+    python -m pytest bench --bench-sizes 10 100 1000 10000
+Эталон записывается один раз на эталонной машине (числа с других машин несравнимы) и лежит
+в bench/baselines/<машина>/NNNN_baseline.json:
+    python -m pytest bench --benchmark-save=baseline
+Сравнение с последним эталоном этой машины включается явно и падает, когда медиана хуже
+больше чем на REGRESSION_LIMIT:
+    python -m pytest bench --bench-compare
+Без флага (или без эталона для этой машины) бенчмарки только измеряют.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.utils import get_machine_id, parse_compare_fail
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench import corpus
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+BASELINE_NAME = "baseline"
+REGRESSION_LIMIT = "median:20%"
+
+
+def find_baseline() -> Path | None:
+    # Последний сохранённый эталон этой машины (ОС, интерпретатор и разрядность)
+    baselines = sorted((BASELINE_DIR / get_machine_id()).glob(f"*_{BASELINE_NAME}.json"))
+    return baselines[-1] if baselines else None
+
+
+def pytest_addoption(parser):
+    parser.addoption("--bench-sizes", type=int, nargs="+", default=[10, 100],
+                     help="число товаров в синтетических ТЗ")
+    parser.addoption("--bench-compare", action="store_true",
+                     help="сравнить с сохранённым эталоном этой машины (bench/baselines)")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Выполняется до pytest-benchmark: по --bench-compare включает сравнение с эталоном этой машины
+    option = config.option
+    if not option.bench_compare or option.benchmark_compare:
+        return
+
+    baseline = find_baseline()
+    if baseline is None:
+        print(f"Эталон бенчмарков для {get_machine_id()} не найден, сравнение пропущено")
+        return
+
+    option.benchmark_compare = str(baseline)
+    if not option.benchmark_compare_fail:
+        option.benchmark_compare_fail = [parse_compare_fail(REGRESSION_LIMIT)]
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        metafunc.parametrize("size", metafunc.config.getoption("--bench-sizes"))
+
+
+@pytest.fixture(scope="session")
+def corpus_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("corpus")
+
+
+@pytest.fixture(scope="session")
+def corpus_files(corpus_dir):
+    # Файлы создаются лениво и один раз за сессию: {(size, имя раскладки/формата): путь}
+    cache = {}
+
+    def get(size: int, kind: str) -> Path:
+        key = (size, kind)
+        if key not in cache:
+            products = corpus.make_products(size, seed=size)
+            layout, ext = kind.rsplit(".", 1)
+            path = corpus_dir / f"ТЗ-{size}-{layout}.{ext}"
+            if ext in ("xlsx", "xlsm"):
+                cache[key] = corpus.write_xlsx(path, products, layout)
+            elif ext == "xls":
+                cache[key] = corpus.write_xls(path, products, layout)
+            elif ext == "docx":
+                cache[key] = corpus.write_docx(path, products, layout)
+            else:
+                cache[key] = corpus.write_pdf(path, products, layout)
+        if cache[key] is None:
+            pytest.skip(f"генерация {kind} недоступна (нет xlwt/reportlab/шрифта)")
+        return cache[key]
+
+    return get
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    import run_models
+
+    def extract(text, final_columns) -> dict:
+        return {col: "не указано" for col in final_columns}
+
+    monkeypatch.setattr(run_models, "extract_gemma_2_2b_it_IQ3_M", extract)
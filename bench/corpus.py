@@ -0,0 +1,248 @@
+"""
+Генератор синтетических ТЗ для бенчмарков и нагрузочного теста.
+
+Создаёт .xlsx/.xlsm/.xls/.docx/.pdf с заданным числом товаров в тех раскладках,
+которые разбирают UnifiedExcelParser и стратегии uniqe_doc и tz_niiar (parsers/strategy.py):
+  excel: "single" - один столбец (название товара, затем строки характеристик),
+         "multi" - таблица с колонками "Наименование" / "Характеристика" / "Значение";
+  docx:  "numbered" - нумерация 2.5 / 2.5.1, "named" - таблица с колонкой "Наименование",
+         "rows" - строка на товар, "paragraphs" - свободный текст,
+         "sections" - свободный текст с разделами "1. Поставка ..." и пунктами товаров "1.1";
+  pdf:   "table" - таблица "№ / Наименование / Характеристики" на нескольких страницах,
+         "prose" - текст договора без таблиц с названиями товаров (товаров в нём нет).
+
+Пример:
+    python -m bench.corpus test_data/input --products 10 100 1000 --seed 1
+"""
+import argparse
+import random
+from pathlib import Path
+
+from common.constants import PRODUCT_NAMES, SYNONYMS
+
+EXCEL_LAYOUTS = ("single", "multi")
+DOCX_LAYOUTS = ("numbered", "named", "rows", "paragraphs", "sections")
+PDF_LAYOUTS = ("table", "prose")
+# Товаров в разделе раскладки "sections"
+SECTION_SIZE = 10
+
+MODELS = ("ДСП", "ДПО", "ДКУ", "LED-Line", "Prom", "Street", "Office", "Ex-Pro")
+VALUES = {
+    "Мощность, Вт": lambda r: f"не более {r.choice((18, 20, 36, 40, 50, 100, 150))} Вт",
+    "Св. поток, Лм": lambda r: f"не менее {r.randrange(1500, 20000, 100)} Лм",
+    "IP": lambda r: f"IP{r.choice((20, 40, 54, 65, 66, 67))}",
+    "Габариты": lambda r: f"{r.randrange(200, 1300, 5)}*{r.randrange(50, 300, 5)}*{r.randrange(30, 150, 5)}",
+    "Цвет. температура, К": lambda r: f"{r.choice((3000, 4000, 5000, 6500))} К",
+    "Вес, кг": lambda r: f"{r.uniform(0.3, 12):.1f}",
+    "Напряжение, В": lambda r: r.choice(("176-264 В", "85-265 В", "220 В ±10%")),
+    "Температура эксплуатации": lambda r: f"от -{r.choice((20, 40, 60))} до +{r.choice((35, 40, 50))} °C",
+    "Срок службы (работы) светильника": lambda r: f"не менее {r.choice((50000, 70000, 100000))} часов",
+    "Тип КСС": lambda r: r.choice(("Д", "Ш", "Г", "К", "120°")),
+    "Гарантия": lambda r: f"{r.choice((3, 5, 7))} лет",
+    "Индекс цветопередачи (CRI, Ra)": lambda r: f"Ra > {r.choice((70, 80, 90))}",
+    "Коэффициент пульсаций": lambda r: f"не более {r.choice((1, 5, 10))}%",
+}
+
+
+def make_products(count: int, seed: int = 0) -> list[tuple[str, list[tuple[str, str]]]]:
+    # Список (название, [(характеристика, значение), ...]); характеристики названы синонимами из SYNONYMS
+    rng = random.Random(seed)
+    names = [name.strip() for name in PRODUCT_NAMES]
+    products = []
+    for i in range(count):
+        name = f"{rng.choice(names)} светодиодный {rng.choice(MODELS)}-{rng.randrange(10, 999)} или аналог"
+        keys = rng.sample(sorted(VALUES), rng.randrange(5, len(VALUES)))
+        characteristics = [(rng.choice(SYNONYMS.get(key, [key])).capitalize(), VALUES[key](rng)) for key in keys]
+        products.append((name, characteristics))
+    return products
+
+
+def excel_rows(products, layout: str) -> list[list[str]]:
+    if layout == "single":
+        rows = [["Техническое задание на поставку светотехнической продукции"]]
+        for name, characteristics in products:
+            rows.append([name])
+            rows.extend([f"{key}: {value}"] for key, value in characteristics)
+        return rows
+
+    rows = [["Техническое задание"], ["№", "Наименование", "Характеристика", "Значение", "Кол-во"]]
+    for i, (name, characteristics) in enumerate(products, start=1):
+        key, value = characteristics[0]
+        rows.append([str(i), name, key, value, "10"])
+        rows.extend(["", "", key, value, ""] for key, value in characteristics[1:])
+    return rows
+
+
+def write_xlsx(path: Path, products, layout: str) -> Path:
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in excel_rows(products, layout):
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+def write_xls(path: Path, products, layout: str) -> Path | None:
+    # xlwt нужен только для генерации .xls; без него формат пропускается
+    try:
+        import xlwt
+    except ImportError:
+        print("xlwt не установлен, .xls не создаётся")
+        return None
+
+    workbook = xlwt.Workbook(encoding="utf-8")
+    sheet = workbook.add_sheet("ТЗ")
+    # Лимит формата .xls - 65536 строк
+    for row_idx, row in enumerate(excel_rows(products, layout)[:65536]):
+        for col_idx, value in enumerate(row):
+            sheet.write(row_idx, col_idx, value)
+    workbook.save(str(path))
+    return path
+
+
+def write_docx(path: Path, products, layout: str) -> Path:
+    import docx
+
+    document = docx.Document()
+    document.add_heading("Техническое задание", level=1)
+    document.add_paragraph("Поставка светотехнической продукции для нужд заказчика.")
+
+    if layout == "paragraphs":
+        for name, characteristics in products:
+            document.add_paragraph(name)
+            for key, value in characteristics:
+                document.add_paragraph(f"{key}: {value}")
+            document.add_paragraph("Гарантия изготовителя не менее 3 лет.")
+
+    elif layout == "sections":
+        # Заголовки разделов содержат наименование, но товарами не являются
+        for i in range(0, len(products), SECTION_SIZE):
+            section = i // SECTION_SIZE + 1
+            document.add_paragraph(f"{section}. Поставка светильников, раздел {section}")
+            for j, (name, characteristics) in enumerate(products[i:i + SECTION_SIZE], start=1):
+                document.add_paragraph(f"{section}.{j} Поставка: {name}")
+                for key, value in characteristics:
+                    document.add_paragraph(f"{key}: {value}")
+
+    elif layout == "numbered":
+        table = document.add_table(rows=0, cols=3)
+        for i, (name, characteristics) in enumerate(products, start=1):
+            cells = table.add_row().cells
+            cells[0].text, cells[1].text, cells[2].text = f"2.{i}", name, ""
+            for j, (key, value) in enumerate(characteristics, start=1):
+                cells = table.add_row().cells
+                cells[0].text, cells[1].text, cells[2].text = f"2.{i}.{j}", key, value
+
+    elif layout == "named":
+        table = document.add_table(rows=1, cols=3)
+        header = table.rows[0].cells
+        header[0].text, header[1].text, header[2].text = "Наименование", "Характеристика", "Значение"
+        for name, characteristics in products:
+            cells = table.add_row().cells
+            cells[0].text = name
+            for key, value in characteristics:
+                cells = table.add_row().cells
+                cells[0].text, cells[1].text, cells[2].text = "", key, value
+
+    else:
+        table = document.add_table(rows=1, cols=3)
+        header = table.rows[0].cells
+        header[0].text, header[1].text, header[2].text = "№", "Товар", "Характеристики"
+        for i, (name, characteristics) in enumerate(products, start=1):
+            cells = table.add_row().cells
+            cells[0].text, cells[1].text = str(i), name
+            cells[2].text = "\n".join(f"{key}: {value}" for key, value in characteristics)
+
+    document.save(path)
+    return path
+
+
+def find_font() -> Path | None:
+    # Для кириллицы в PDF нужен TTF-шрифт
+    for candidate in ("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+                      "C:/Windows/Fonts/arial.ttf", "/Library/Fonts/Arial.ttf"):
+        if Path(candidate).exists():
+            return Path(candidate)
+    return None
+
+
+def write_pdf(path: Path, products, layout: str = "table", font: Path | None = None) -> Path | None:
+    # reportlab нужен только для генерации .pdf; без него формат пропускается
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+        from reportlab.lib.styles import getSampleStyleSheet
+    except ImportError:
+        print("reportlab не установлен, .pdf не создаётся")
+        return None
+
+    font = font or find_font()
+    if font is None:
+        print("Не найден TTF-шрифт с кириллицей, .pdf не создаётся")
+        return None
+    pdfmetrics.registerFont(TTFont("Bench", str(font)))
+
+    style = getSampleStyleSheet()["Normal"]
+    style.fontName = "Bench"
+    title = Paragraph("Техническое задание на поставку светотехнической продукции", style)
+    document = SimpleDocTemplate(str(path), pagesize=A4)
+
+    if layout == "prose":
+        # Условия договора упоминают товары, но таблицы товаров нет
+        document.build([title] + [
+            Paragraph(f"{i}. Поставщик обязан поставить {name.lower()} в срок, указанный в договоре. "
+                      f"Приёмка товара выполняется по количеству и качеству.", style)
+            for i, (name, _) in enumerate(products, start=1)
+        ])
+        return path
+
+    rows = [["№", "Наименование", "Характеристики"]]
+    for i, (name, characteristics) in enumerate(products, start=1):
+        rows.append([f"{i}.", name, "; ".join(f"{key}: {value}" for key, value in characteristics[:2])])
+        rows.extend(["", "", f"{key}: {value}"] for key, value in characteristics[2:])
+
+    table = Table(rows, colWidths=(30, 230, 270), repeatRows=1)
+    table.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), "Bench"),
+        ("FONTSIZE", (0, 0), (-1, -1), 7),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+    ]))
+    document.build([title, table])
+    return path
+
+
+def generate(output_dir: Path, sizes: list[int], seed: int = 0) -> list[Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for size in sizes:
+        products = make_products(size, seed)
+        for layout in EXCEL_LAYOUTS:
+            paths.append(write_xlsx(output_dir / f"ТЗ-{size}-{layout}.xlsx", products, layout))
+            paths.append(write_xlsx(output_dir / f"ТЗ-{size}-{layout}.xlsm", products, layout))
+            paths.append(write_xls(output_dir / f"ТЗ-{size}-{layout}.xls", products, layout))
+        for layout in DOCX_LAYOUTS:
+            paths.append(write_docx(output_dir / f"ТЗ-{size}-{layout}.docx", products, layout))
+        for layout in PDF_LAYOUTS:
+            paths.append(write_pdf(output_dir / f"ТЗ-{size}-{layout}.pdf", products, layout))
+
+    return [path for path in paths if path is not None]
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Генерация синтетических ТЗ")
+    arg_parser.add_argument("output_dir", type=Path)
+    arg_parser.add_argument("--products", type=int, nargs="+", default=[10, 100, 1000])
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    for path in generate(args.output_dir, args.products, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Нагрузочное тестирование сервиса загрузки (run.py).
+
+Поднимает сервер в отдельном процессе с заглушкой вместо модели (задержка настраивается),
+проигрывает корпус ТЗ на /old/upload с заданной параллельностью и интенсивностью
+и печатает p50/p95/p99 задержки, пропускную способность, долю ошибок и RSS сервера во времени.
+
+Пример:
+    python -m bench.loadtest test_data/input --concurrency 8 --rate 2 --duration 60 --llm-latency 0.5
+"""
+import argparse
+import json
+import math
+import mimetypes
+import multiprocessing
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+CORPUS_EXTENSIONS = {".doc", ".docx", ".xlsx", ".xls", ".xlsm", ".pdf"}
+
+
+def stub_extract(latency: float, jitter: float):
+    # Заглушка модели: спит заданное время и возвращает пустую форму
+    def extract(text, final_columns) -> dict:
+        time.sleep(max(0.0, random.gauss(latency, jitter)))
+        return {col: "не указано" for col in final_columns}
+
+    return extract
+
+
+def serve(port: int, llm_latency: float, llm_jitter: float) -> None:
+    import uvicorn
+    import run_models
+    import run
+
+    run_models.extract_gemma_2_2b_it_IQ3_M = stub_extract(llm_latency, llm_jitter)
+    uvicorn.run(run.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def read_rss(pid: int) -> int | None:
+    # RSS процесса в байтах (только Linux, через /proc)
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+
+    except OSError:
+        return None
+
+    return None
+
+
+def encode_multipart(path: Path, fields: dict[str, str]) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{path.name}"\r\n'
+                 f'Content-Type: {content_type}\r\n\r\n'.encode())
+    parts.append(path.read_bytes())
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def send(url: str, path: Path, force: bool, timeout: float) -> int | str:
+    body, content_type = encode_multipart(path, {"force": "true"} if force else {})
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+
+    except urllib.error.HTTPError as e:
+        status = e.code
+
+    except Exception as e:
+        status = type(e).__name__
+
+    return status
+
+
+def wait_for_server(base_url: str, timeout: float = 60) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/old/", timeout=1):
+                return
+
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+
+    raise TimeoutError(f"Сервер {base_url} не поднялся за {timeout} с")
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    # Метод ближайшего ранга
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def run_load(base_url: str, corpus: list[Path], concurrency: int, rate: float | None, duration: float,
+             requests_limit: int | None, force: bool, timeout: float, server_pid: int | None) -> dict:
+    """
+    rate=None - замкнутый цикл: concurrency клиентов шлют запросы друг за другом.
+    rate=N - открытый цикл: запросы приходят пуассоновским потоком N в секунду,
+    но одновременно выполняется не больше concurrency (остальные ждут в очереди клиента).
+    """
+    url = f"{base_url}/old/upload"
+    results: list[tuple[float, float, int | str]] = []
+    results_lock = threading.Lock()
+    rss_timeline: list[tuple[float, int]] = []
+    stop = threading.Event()
+    started = time.perf_counter()
+
+    def record(path: Path, scheduled: float) -> None:
+        status = send(url, path, force, timeout)
+        with results_lock:
+            # Задержка считается от момента поступления запроса, включая ожидание свободного клиента
+            results.append((scheduled - started, time.perf_counter() - scheduled, status))
+
+    def sample_rss() -> None:
+        while not stop.wait(1.0):
+            rss = read_rss(server_pid) if server_pid else None
+            if rss is not None:
+                rss_timeline.append((round(time.perf_counter() - started, 1), rss))
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+
+    sent = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if rate:
+            next_at = time.perf_counter()
+            while time.perf_counter() - started < duration and (requests_limit is None or sent < requests_limit):
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+                executor.submit(record, corpus[sent % len(corpus)], time.perf_counter())
+                sent += 1
+                next_at += random.expovariate(rate)
+        else:
+            def client(offset: int) -> None:
+                index = offset
+                while time.perf_counter() - started < duration and (requests_limit is None or index < requests_limit):
+                    record(corpus[index % len(corpus)], time.perf_counter())
+                    index += concurrency
+
+            for offset in range(concurrency):
+                executor.submit(client, offset)
+
+    stop.set()
+    sampler.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for _, latency, status in results if status == 200]
+    statuses: dict[str, int] = {}
+    for _, _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    return {
+        "requests": len(results),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0,
+        "error_rate": round(1 - len(latencies) / len(results), 4) if results else 0,
+        "statuses": statuses,
+        "latency_seconds": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "mean": statistics.fmean(latencies) if latencies else float("nan"),
+            "max": max(latencies) if latencies else float("nan"),
+        },
+        "server_rss_bytes": rss_timeline,
+    }
+
+
+def print_report(report: dict) -> None:
+    latency = report["latency_seconds"]
+    print(f"\nЗапросов: {report['requests']} за {report['elapsed_seconds']} с")
+    print(f"Пропускная способность: {report['throughput_rps']} запр/с, ошибки: {report['error_rate'] * 100:.1f}%")
+    print(f"Статусы: {report['statuses']}")
+    print(f"Задержка, с: p50={latency['p50']:.3f} p95={latency['p95']:.3f} p99={latency['p99']:.3f} "
+          f"max={latency['max']:.3f}")
+    if report["server_rss_bytes"]:
+        print("RSS сервера, МБ:")
+        for second, rss in report["server_rss_bytes"]:
+            print(f"  {second:>7.1f} с  {rss / 1024 / 1024:8.1f}")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Нагрузочный тест /old/upload с заглушкой модели")
+    arg_parser.add_argument("corpus", type=Path, help="каталог с файлами ТЗ")
+    arg_parser.add_argument("--concurrency", type=int, default=4)
+    arg_parser.add_argument("--rate", type=float, default=None, help="запросов в секунду (открытый цикл)")
+    arg_parser.add_argument("--duration", type=float, default=60, help="длительность теста, с")
+    arg_parser.add_argument("--requests", type=int, default=None, help="ограничение числа запросов")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.5, help="задержка заглушки модели на товар, с")
+    arg_parser.add_argument("--llm-jitter", type=float, default=0.1)
+    arg_parser.add_argument("--use-cache", action="store_true", help="не отправлять force (разрешить кеш результатов)")
+    arg_parser.add_argument("--timeout", type=float, default=600)
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--url", default=None, help="адрес уже запущенного сервера (без запуска заглушки)")
+    arg_parser.add_argument("--json", type=Path, default=None, help="сохранить отчёт в JSON")
+    args = arg_parser.parse_args()
+
+    corpus = sorted(path for path in args.corpus.rglob("*") if path.suffix.lower() in CORPUS_EXTENSIONS)
+    if not corpus:
+        arg_parser.error(f"в {args.corpus} нет файлов {sorted(CORPUS_EXTENSIONS)}")
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server = multiprocessing.Process(target=serve, args=(args.port, args.llm_latency, args.llm_jitter))
+        server.start()
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        wait_for_server(base_url)
+        report = run_load(base_url, corpus, args.concurrency, args.rate, args.duration, args.requests,
+                          not args.use_cache, args.timeout, server.pid if server else None)
+
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join()
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import shutil
+import zipfile
+from pathlib import Path
+
+from common.constants import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_SIZE
+from common.uploads import EXTENSIONS_BY_MAGIC, sniff_kind
+
+# Флаг "имя в UTF-8" в заголовке ZIP; без него архиваторы Windows пишут имена в cp866
+ZIP_FLAG_UTF8 = 0x800
+
+
+class ArchiveRejected(ValueError):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def decode_member_name(info: zipfile.ZipInfo) -> str:
+    if info.flag_bits & ZIP_FLAG_UTF8:
+        return info.filename
+
+    try:
+        return info.filename.encode("cp437").decode("cp866")
+
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+
+def extract_archive(path_to_archive: Path, allowed_extensions: set[str],
+                    max_size: int = UPLOAD_MAX_SIZE) -> list[tuple[str, Path]]:
+    """
+    Потоково распаковывает ZIP-архив в каталог рядом с ним.
+    Каждый файл разжимается кусками, суммарный объём ограничен max_size (защита от zip-бомб).
+    Вложенные каталоги не воссоздаются, берётся только имя файла.
+    Как и в save_upload, сигнатура файла сверяется с расширением; несовпадающие файлы пропускаются.
+    Возвращает список (имя в архиве, путь на диске) для поддерживаемых файлов.
+    """
+    if not zipfile.is_zipfile(path_to_archive):
+        raise ArchiveRejected("Файл не является ZIP-архивом", status_code=415)
+
+    output_dir = path_to_archive.with_suffix("")
+    output_dir.mkdir(exist_ok=True)
+    extracted = []
+    total_size = 0
+
+    with zipfile.ZipFile(path_to_archive) as archive:
+        for index, info in enumerate(archive.infolist()):
+            if info.is_dir():
+                continue
+
+            name = Path(decode_member_name(info)).name
+            if Path(name).suffix.lower() not in allowed_extensions:
+                print(f"Пропуск файла из архива: {name}")
+                continue
+
+            # Номер позиции в имени исключает совпадения одинаковых имён из разных папок архива
+            output_path = output_dir / f"{index:04d}-{name}"
+            with archive.open(info) as source:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if Path(name).suffix.lower() not in EXTENSIONS_BY_MAGIC.get(sniff_kind(chunk), set()):
+                    print(f"Пропуск файла из архива: {name}, содержимое не соответствует расширению")
+                    continue
+
+                with open(output_path, "wb") as target:
+                    while chunk:
+                        total_size += len(chunk)
+                        if total_size > max_size:
+                            target.close()
+                            shutil.rmtree(output_dir, ignore_errors=True)
+                            raise ArchiveRejected(f"Распакованный архив больше {max_size // (1024 * 1024)} МБ",
+                                                  status_code=413)
+                        target.write(chunk)
+                        chunk = source.read(UPLOAD_CHUNK_SIZE)
+
+            extracted.append((name, output_path))
+
+    return extracted
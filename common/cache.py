@@ -0,0 +1,80 @@
+import hashlib
+from pathlib import Path
+
+from diskcache import Cache
+
+from common.constants import (DIR_CACHE_DOCX, DIR_CACHE_OCR, DIR_CACHE_RESULTS, DOCX_CACHE_SIZE_LIMIT,
+                              OCR_CACHE_SIZE_LIMIT, RESULT_CACHE_SIZE_LIMIT)
+from common.metrics import CACHE_REQUESTS
+from common.storage import atomic_path
+
+
+def make_result_key(file_sha256: str, parser_version: str, model_name: str, prompt: str) -> str:
+    """
+    Ключ результата: хеш содержимого файла + версии парсера, модели и промпта.
+    Смена любой из версий автоматически делает старые записи недостижимыми.
+    """
+    prompt_sha256 = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{file_sha256}:{parser_version}:{model_name}:{prompt_sha256}"
+
+
+class ResultCache:
+    """
+    Кеш готовых выходных книг Excel по ключу из make_result_key.
+    Хранится на диске, при превышении size_limit вытесняются давно не использованные записи.
+    """
+    name = "result"
+
+    def __init__(self, directory: Path = DIR_CACHE_RESULTS, size_limit: int = RESULT_CACHE_SIZE_LIMIT):
+        self.cache = Cache(str(directory), size_limit=size_limit, eviction_policy="least-recently-used")
+
+    def get(self, key: str, output_file: Path) -> bool:
+        # При попадании записываем сохранённую книгу в output_file
+        data = self.cache.get(key)
+
+        if data is None:
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return False
+
+        CACHE_REQUESTS.inc(cache=self.name, result="hit")
+        with atomic_path(output_file) as tmp_file:
+            tmp_file.write_bytes(data)
+        return True
+
+    def put(self, key: str, output_file: Path) -> None:
+        self.cache.set(key, output_file.read_bytes())
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class DocxCache(ResultCache):
+    # Сконвертированные из .doc файлы .docx по хешу содержимого .doc (см. common.conversion)
+    name = "docx"
+
+    def __init__(self, directory: Path = DIR_CACHE_DOCX, size_limit: int = DOCX_CACHE_SIZE_LIMIT):
+        super().__init__(directory, size_limit)
+
+
+class OcrCache:
+    """
+    Кеш распознанного текста страниц по хешу изображения страницы (см. common.ocr.image_key).
+    Один и тот же скан в разных загрузках распознаётся один раз; кеш общий для процессов пула.
+    """
+
+    def __init__(self, directory: Path = DIR_CACHE_OCR, size_limit: int = OCR_CACHE_SIZE_LIMIT):
+        self.cache = Cache(str(directory), size_limit=size_limit, eviction_policy="least-recently-used")
+
+    def get(self, key: str) -> list[list[str | None]] | None:
+        rows = self.cache.get(key)
+        CACHE_REQUESTS.inc(cache="ocr", result="miss" if rows is None else "hit")
+        return rows
+
+    def put(self, key: str, rows: list[list[str | None]]) -> None:
+        self.cache.set(key, rows)
+
+    def clear(self) -> None:
+        self.cache.clear()
@@ -6,6 +6,12 @@ DIR_DATA = Path(CWD, "test_data")
 DIR_DATA_INPUT = Path(DIR_DATA, "input")
 DIR_DATA_OUTPUT = Path(DIR_DATA, "output")
 PATH_DATA_INTERMEDIATE_XLSX_FILE = Path(DIR_DATA_OUTPUT, "intermediate.xlsx")
+DIR_UPLOADS = Path(CWD, "uploads")
+DIR_DOWNLOADS = Path(CWD, "downloads")
+DIR_CACHE = Path(CWD, "cache")
+DIR_CACHE_RESULTS = Path(DIR_CACHE, "results")
+DIR_CACHE_OCR = Path(DIR_CACHE, "ocr")
+DIR_CACHE_DOCX = Path(DIR_CACHE, "docx")
 
 # synonyms
 PRODUCT_NAMES = ["Светильник", "Прожектор", "Лампа", "Осветительный прибор", "Лам. "]
@@ -120,3 +126,56 @@ def filter_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     min_characteristics = determine_min_characteristics(df)
     filtered_df = df[df.apply(count_valid_chars, axis=1) >= min_characteristics]
     return filtered_df
+
+# uploads
+UPLOAD_MAX_SIZE = 50 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# cache
+# Увеличивать при изменении логики парсеров, чтобы старые результаты не отдавались из кеша
+PARSER_VERSION = "2"
+RESULT_CACHE_SIZE_LIMIT = 1024 * 1024 * 1024
+OCR_CACHE_SIZE_LIMIT = 256 * 1024 * 1024
+DOCX_CACHE_SIZE_LIMIT = 512 * 1024 * 1024
+
+# jobs
+JOB_LEASE_SECONDS = 120
+JOB_HEARTBEAT_SECONDS = 30
+JOB_MAX_ATTEMPTS = 3
+
+# storage
+STORAGE_MAX_AGE_DAYS = 30
+STORAGE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+STORAGE_TMP_GRACE = 6 * 60 * 60
+STORAGE_CLEANUP_INTERVAL = 60 * 60
+
+# workbooks
+# Строк листа в одном куске DataFrame при потоковом чтении Excel
+EXCEL_CHUNK_ROWS = 10000
+# После стольких пустых строк подряд лист считается законченным (форматирование до конца листа)
+EXCEL_EMPTY_ROWS_LIMIT = 1000
+
+# pdf
+# Параллельное извлечение таблиц включается для файлов от стольких страниц
+PDF_PARALLEL_MIN_PAGES = 8
+# Страниц в одной задаче процесса-обработчика (каждая задача заново открывает файл)
+PDF_PAGES_PER_TASK = 4
+# Разрешение, в котором страница без текстового слоя рендерится для OCR
+PDF_OCR_DPI = 300
+# Слова строки OCR, между которыми разрыв больше стольких высот строки, попадают в разные ячейки
+PDF_OCR_CELL_GAP = 2
+
+# paragraphs
+# Предельная длина описания товара в свободном тексте ТЗ, абзацев
+PARAGRAPH_BLOCK_MAX_PARAGRAPHS = 30
+
+# doc
+# Предельное время конвертации одного .doc в .docx, с
+DOC_CONVERSION_TIMEOUT = 120
+
+# strategies
+# Выборка документа, на которой сравниваются стратегии парсинга: строк первого листа Excel,
+# таблиц .docx (с абзацами до них) и страниц PDF
+STRATEGY_SAMPLE_ROWS = 300
+STRATEGY_SAMPLE_TABLES = 5
+STRATEGY_SAMPLE_PAGES = 3
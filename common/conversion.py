@@ -0,0 +1,227 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+
+import settings
+from common.cache import DocxCache
+from common.constants import DOC_CONVERSION_TIMEOUT, UPLOAD_CHUNK_SIZE
+from common.metrics import DOC_CONVERSION_SECONDS, merge_metrics, run_with_metrics
+
+try:
+    from spire.doc import Document, FileFormat
+
+except ImportError:
+    Document = None
+    FileFormat = None
+
+
+class DocConverter:
+    """
+    Конвертер .doc -> .docx: convert() пишет .docx с тем же именем в output_dir и возвращает его путь.
+    warm_up() выполняется один раз при старте процесса пула, чтобы первая загрузка не платила за запуск.
+    """
+    name = ""
+
+    def available(self) -> bool:
+        return True
+
+    def warm_up(self) -> None:
+        pass
+
+    def convert(self, path_to_file_doc: Path, output_dir: Path) -> Path:
+        raise NotImplementedError
+
+
+class SpireConverter(DocConverter):
+    name = "spire"
+
+    def available(self) -> bool:
+        return Document is not None
+
+    def warm_up(self) -> None:
+        # Первый Document() загружает нативную библиотеку Spire - это и есть долгая инициализация
+        Document().Close()
+
+    def convert(self, path_to_file_doc: Path, output_dir: Path) -> Path:
+        path_to_file_docx = Path(output_dir, path_to_file_doc.with_suffix(".docx").name)
+        document = Document()
+        try:
+            document.LoadFromFile(str(path_to_file_doc))
+            document.SaveToFile(str(path_to_file_docx), FileFormat.Docx2016)
+
+        finally:
+            document.Close()
+        return path_to_file_docx
+
+
+class LibreOfficeConverter(DocConverter):
+    """
+    soffice --headless; у каждого процесса пула свой профиль, иначе параллельные запуски мешают друг другу.
+    Этот конвертер не прогретый: soffice запускается заново на каждый файл, warm_up только создаёт профиль.
+    """
+    name = "libreoffice"
+
+    @staticmethod
+    def command() -> str | None:
+        return settings.libreoffice_cmd or shutil.which("soffice") or shutil.which("libreoffice")
+
+    def available(self) -> bool:
+        return self.command() is not None
+
+    @staticmethod
+    def profile_option() -> str:
+        profile = Path(tempfile.gettempdir(), f"docs-lo-profile-{os.getpid()}")
+        return f"-env:UserInstallation={profile.as_uri()}"
+
+    def warm_up(self) -> None:
+        # Создаёт профиль процесса заранее: на первом запуске это занимает несколько секунд
+        subprocess.run([self.command(), self.profile_option(), "--headless", "--terminate_after_init"],
+                       capture_output=True, timeout=DOC_CONVERSION_TIMEOUT)
+
+    def convert(self, path_to_file_doc: Path, output_dir: Path) -> Path:
+        path_to_file_docx = Path(output_dir, path_to_file_doc.with_suffix(".docx").name)
+        result = subprocess.run([self.command(), self.profile_option(), "--headless", "--convert-to", "docx",
+                                 "--outdir", str(output_dir), str(path_to_file_doc)],
+                                capture_output=True, timeout=DOC_CONVERSION_TIMEOUT)
+        if result.returncode or not path_to_file_docx.exists():
+            raise RuntimeError(f"LibreOffice не сконвертировал {path_to_file_doc.name}: "
+                               f"{result.stderr.decode(errors='replace').strip()}")
+        return path_to_file_docx
+
+
+# Порядок автоматического выбора: сначала Spire, затем LibreOffice
+CONVERTERS = {converter.name: converter for converter in (SpireConverter(), LibreOfficeConverter())}
+
+
+def select_converters(engine: str | None = None) -> list[DocConverter]:
+    # engine (по умолчанию settings.doc_converter), затем остальные доступные как запасные
+    engine = engine or settings.doc_converter
+    if engine != "auto" and engine not in CONVERTERS:
+        raise ValueError(f"Неизвестный конвертер .doc: {engine}")
+
+    converters = [converter for converter in CONVERTERS.values() if converter.available()]
+    if not converters:
+        raise RuntimeError("Нет конвертера .doc: нужен Spire.Doc или LibreOffice")
+    converters.sort(key=lambda converter: converter.name != engine)
+    return converters
+
+
+def init_worker(engine: str | None) -> None:
+    try:
+        select_converters(engine)[0].warm_up()
+
+    except Exception as e:
+        print(f"Не удалось прогреть конвертер .doc: {e}")
+
+
+def convert_with(name: str, path_to_file_doc: Path, output_dir: Path) -> Path:
+    # Выполняется в процессе пула
+    return CONVERTERS[name].convert(path_to_file_doc, output_dir)
+
+
+def file_sha256(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(UPLOAD_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class DocConversionService:
+    """
+    Конвертация .doc -> .docx в постоянном пуле прогретых процессов.
+    Результат кешируется по хешу содержимого .doc и имени конвертера, который его сделал:
+    повторная загрузка того же файла (под любым именем) не конвертируется заново,
+    а результат запасного конвертера не выдаётся за результат основного. .docx пишется в каталог задачи.
+    """
+
+    def __init__(self, workers: int | None = None, engine: str | None = None, cache: DocxCache | None = None):
+        self.workers = settings.doc_conversion_workers if workers is None else workers
+        self.engine = engine
+        self.cache = cache or DocxCache()
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        # Пул создаётся при первой конвертации и живёт до конца процесса
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                                    initargs=(self.engine,))
+            return self.executor
+
+    def start(self) -> None:
+        # Запускает и прогревает процессы пула заранее, не дожидаясь первой загрузки .doc
+        if self.workers <= 0:
+            return
+        executor = self.get_executor()
+        for _ in range(self.workers):
+            executor.submit(os.getpid)
+
+    def restart(self, broken: ProcessPoolExecutor) -> None:
+        # Пул сломан (упал нативный код Spire, процесс убит): следующий get_executor создаст новый
+        with self.lock:
+            if self.executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+    def run(self, converter: DocConverter, path_to_file_doc: Path, output_dir: Path) -> Path:
+        if self.workers <= 0:
+            return converter.convert(path_to_file_doc, output_dir)
+
+        executor = self.get_executor()
+        try:
+            path_to_file_docx, values = executor.submit(run_with_metrics, convert_with, converter.name,
+                                                        path_to_file_doc, output_dir).result()
+
+        except BrokenProcessPool as e:
+            print(f"Пул конвертации .doc сломан ({e}), пересоздаём и повторяем {path_to_file_doc.name}")
+            self.restart(executor)
+            path_to_file_docx, values = self.get_executor().submit(run_with_metrics, convert_with, converter.name,
+                                                                   path_to_file_doc, output_dir).result()
+        merge_metrics(values)
+        return path_to_file_docx
+
+    def convert(self, path_to_file_doc: Path, output_dir: Path) -> Path:
+        path_to_file_docx = Path(output_dir, path_to_file_doc.with_suffix(".docx").name)
+        sha256 = file_sha256(path_to_file_doc)
+
+        converters = select_converters(self.engine)
+        for i, converter in enumerate(converters):
+            # Кеш запасного конвертера проверяется только после отказа основного
+            key = f"{sha256}:{converter.name}"
+            if self.cache.get(key, path_to_file_docx):
+                return path_to_file_docx
+
+            try:
+                with DOC_CONVERSION_SECONDS.time():
+                    path_to_file_docx = self.run(converter, path_to_file_doc, output_dir)
+                break
+
+            except Exception as e:
+                if i == len(converters) - 1:
+                    raise
+                print(f"{converter.name} не сконвертировал {path_to_file_doc.name}: {e}; "
+                      f"пробуем {converters[i + 1].name}")
+
+        self.cache.put(key, path_to_file_docx)
+        return path_to_file_docx
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+
+@lru_cache(maxsize=1)
+def get_conversion_service() -> DocConversionService:
+    # Один сервис (и один пул) на процесс
+    return DocConversionService()
@@ -0,0 +1,173 @@
+import posixpath
+import zipfile
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from lxml import etree
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+BODY = f"{W}body"
+P = f"{W}p"
+R = f"{W}r"
+T = f"{W}t"
+TAB = f"{W}tab"
+PTAB = f"{W}ptab"
+BR = f"{W}br"
+CR = f"{W}cr"
+NO_BREAK_HYPHEN = f"{W}noBreakHyphen"
+HYPERLINK = f"{W}hyperlink"
+TBL = f"{W}tbl"
+TR = f"{W}tr"
+TC = f"{W}tc"
+TR_PR = f"{W}trPr"
+GRID_BEFORE = f"{W}gridBefore"
+TC_PR = f"{W}tcPr"
+GRID_SPAN = f"{W}gridSpan"
+V_MERGE = f"{W}vMerge"
+VAL = f"{W}val"
+TYPE = f"{W}type"
+
+OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+RELATIONSHIP = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+
+# Виды блоков тела документа
+BLOCK_PARAGRAPH = "paragraph"
+BLOCK_TABLE = "table"
+
+
+class Block(NamedTuple):
+    kind: str
+    text: str | None = None
+    rows: list[list[str]] | None = None
+
+
+def run_text(run) -> str:
+    # Как Run.text в python-docx: табуляции, переносы строки и неразрывные дефисы заменяются символами
+    parts = []
+    for child in run:
+        if child.tag == T:
+            parts.append(child.text or "")
+        elif child.tag in (TAB, PTAB):
+            parts.append("\t")
+        elif child.tag == CR or child.tag == BR and child.get(TYPE, "textWrapping") == "textWrapping":
+            parts.append("\n")
+        elif child.tag == NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(paragraph) -> str:
+    parts = []
+    for child in paragraph:
+        if child.tag == R:
+            parts.append(run_text(child))
+        elif child.tag == HYPERLINK:
+            parts.extend(run_text(run) for run in child.iterchildren(R))
+    return "".join(parts)
+
+
+def cell_text(cell) -> str:
+    # Только абзацы самой ячейки, текст вложенных таблиц не входит (как _Cell.text)
+    return "\n".join(paragraph_text(paragraph) for paragraph in cell.iterchildren(P))
+
+
+def int_val(parent, tag: str, default: int) -> int:
+    element = parent.find(tag) if parent is not None else None
+    return int(element.get(VAL, default)) if element is not None else default
+
+
+def read_row(row, above: dict[int, tuple[int, str]]) -> tuple[list[str], dict[int, tuple[int, str]]]:
+    """
+    Ячейки строки по сетке таблицы, как row.cells в python-docx: ячейка с gridSpan повторяется
+    по числу колонок, продолжение вертикального объединения (vMerge) берёт текст ячейки выше.
+    above - ячейки предыдущей строки по смещению в сетке: {смещение: (ширина, текст)}.
+    Объединения разворачиваются по одной строке за раз, без пересчёта всей таблицы.
+    """
+    offset = int_val(row.find(TR_PR), GRID_BEFORE, 0)
+    cells = []
+    current = {}
+    for cell in row.iterchildren(TC):
+        properties = cell.find(TC_PR)
+        span = int_val(properties, GRID_SPAN, 1)
+        v_merge = properties.find(V_MERGE) if properties is not None else None
+        if v_merge is not None and v_merge.get(VAL, "continue") == "continue" and offset in above:
+            # Ячейка выше повторяется по своей ширине, а сетка сдвигается по ширине этой ячейки
+            width, text = above[offset]
+        else:
+            width, text = span, cell_text(cell)
+
+        cells.extend([text] * width)
+        current[offset] = (width, text)
+        offset += span
+    return cells, current
+
+
+def document_part(archive: zipfile.ZipFile) -> str:
+    # Основная часть документа по связям пакета; почти всегда word/document.xml
+    try:
+        relationships = etree.fromstring(archive.read("_rels/.rels"))
+
+    except KeyError:
+        return "word/document.xml"
+
+    for relationship in relationships.iter(RELATIONSHIP):
+        if relationship.get("Type") == OFFICE_DOCUMENT:
+            return posixpath.normpath(relationship.get("Target").lstrip("/"))
+    return "word/document.xml"
+
+
+def release(element) -> None:
+    # Освобождает разобранный элемент и всё, что перед ним у того же родителя
+    element.clear()
+    parent = element.getparent()
+    while element.getprevious() is not None:
+        del parent[0]
+
+
+def iter_blocks(path_to_file: Path, max_tables: int | None = None) -> Iterator[Block]:
+    """
+    Абзацы и таблицы тела .docx в порядке документа, как doc.paragraphs и doc.tables python-docx.
+    document.xml читается потоково (lxml.iterparse): каждая строка таблицы разбирается один раз
+    и сразу освобождается, поэтому время линейно по размеру документа, а в памяти остаются
+    только тексты строк текущей таблицы.
+    max_tables - чтение останавливается после стольких таблиц (выборка для оценки стратегий).
+    """
+    with zipfile.ZipFile(path_to_file) as archive, archive.open(document_part(archive)) as document:
+        rows = []
+        above = {}
+        tables = 0
+        for _, element in etree.iterparse(document, events=("end",), tag=(P, TR, TBL)):
+            parent = element.getparent()
+            if element.tag == TR:
+                if parent.tag == TBL and parent.getparent().tag == BODY:
+                    cells, above = read_row(element, above)
+                    rows.append(cells)
+                    release(element)
+
+            elif parent.tag != BODY:
+                continue
+
+            elif element.tag == P:
+                yield Block(BLOCK_PARAGRAPH, text=paragraph_text(element))
+                release(element)
+
+            else:
+                yield Block(BLOCK_TABLE, rows=rows)
+                rows = []
+                above = {}
+                release(element)
+                tables += 1
+                if tables == max_tables:
+                    return
+
+
+def iter_tables(path_to_file: Path) -> Iterator[list[list[str]]]:
+    for block in iter_blocks(path_to_file):
+        if block.kind == BLOCK_TABLE:
+            yield block.rows
+
+
+def iter_paragraphs(path_to_file: Path) -> Iterator[str]:
+    for block in iter_blocks(path_to_file):
+        if block.kind == BLOCK_PARAGRAPH:
+            yield block.text
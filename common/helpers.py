@@ -2,8 +2,6 @@ from pathlib import Path
 
 from openpyxl import load_workbook
 import pandas as pd
-from spire.doc import Document
-from spire.doc import FileFormat
 
 
 def resize_column_in_intermediate_xlsx(path: Path) -> None:
@@ -44,17 +42,9 @@ def convert_list_to_string_with_comma(product_data: dict) -> dict:
     return output_dict
 
 
-def convert_doc_to_docx(path_to_file_doc: Path) -> Path:
-    path_to_file_docx = path_to_file_doc.with_suffix(".docx")
-
-    # Create an object of the Document class
-    document = Document()
-    # Load a Word DOC file
-    document.LoadFromFile(str(path_to_file_doc))
-
-    # Save the DOC file to DOCX format
-    document.SaveToFile(str(path_to_file_docx), FileFormat.Docx2016)
-    # Close the Document object
-    document.Close()
-
-    return path_to_file_docx
\ No newline at end of file
+def products_to_dataframe(product_data: dict) -> pd.DataFrame:
+    # Та же таблица, что раньше читалась из промежуточного файла: строка заголовка и пары (имя, характеристики).
+    # Пустые характеристики - NaN, как пустая ячейка после pd.read_excel
+    product_data = convert_list_to_string_with_comma(product_data)
+    rows = [["name", "value"]] + [[name, value or float("nan")] for name, value in product_data.items()]
+    return pd.DataFrame(rows)
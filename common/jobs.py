@@ -0,0 +1,279 @@
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from common.constants import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class Job:
+    def __init__(self, job_id: str, status: str, payload: dict, result: dict | None = None,
+                 error: str | None = None, attempts: int = 0, created_at: float | None = None):
+        self.job_id = job_id
+        self.status = status
+        self.payload = payload
+        self.result = result
+        self.error = error
+        self.attempts = attempts
+        self.created_at = created_at
+
+
+class JobQueue(ABC):
+    """
+    Очередь задач парсинга/извлечения.
+    Воркер забирает задачу в аренду (lease) на lease_seconds и продлевает её heartbeat'ом.
+    Если воркер упал и аренда истекла, задача снова становится доступной другим воркерам,
+    после max_attempts попыток она помечается как failed.
+    complete/fail от воркера, у которого задачу уже забрали, ничего не меняют.
+    """
+
+    @abstractmethod
+    def enqueue(self, payload: dict) -> str:
+        ...
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> Job | None:
+        ...
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+        ...
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: dict) -> None:
+        ...
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Job | None:
+        ...
+
+    @abstractmethod
+    def pending(self) -> list[Job]:
+        # Задачи в очереди и в работе: их входные файлы ещё нужны воркерам
+        ...
+
+
+class LocalJobQueue(JobQueue):
+    """Очередь в памяти процесса: для одного узла и для тестового запуска воркеров потоками."""
+
+    def __init__(self, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.jobs: dict[str, Job] = {}
+        self.leases: dict[str, tuple[str, float]] = {}
+        self.lock = threading.Lock()
+
+    def enqueue(self, payload: dict) -> str:
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.jobs[job_id] = Job(job_id, STATUS_QUEUED, payload, created_at=time.time())
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> Job | None:
+        now = time.time()
+        with self.lock:
+            for job in self.jobs.values():
+                expired = job.status == STATUS_RUNNING and self.leases[job.job_id][1] < now
+                if job.status != STATUS_QUEUED and not expired:
+                    continue
+
+                if job.attempts >= self.max_attempts:
+                    job.status = STATUS_FAILED
+                    job.error = "Превышено число попыток обработки"
+                    continue
+
+                job.status = STATUS_RUNNING
+                job.attempts += 1
+                self.leases[job.job_id] = (worker_id, now + lease_seconds)
+                return job
+
+        return None
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+        with self.lock:
+            if not self.owns(job_id, worker_id):
+                return False
+            self.leases[job_id] = (worker_id, time.time() + lease_seconds)
+            return True
+
+    def owns(self, job_id: str, worker_id: str) -> bool:
+        # Как в SQLiteJobQueue: результат записывает только последний взявший задачу воркер
+        return self.leases.get(job_id, (None, 0))[0] == worker_id
+
+    def complete(self, job_id: str, worker_id: str, result: dict) -> None:
+        with self.lock:
+            if not self.owns(job_id, worker_id):
+                return
+            job = self.jobs[job_id]
+            job.status = STATUS_DONE
+            job.result = result
+            self.leases.pop(job_id, None)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        with self.lock:
+            if not self.owns(job_id, worker_id):
+                return
+            job = self.jobs[job_id]
+            job.status = STATUS_FAILED
+            job.error = error
+            self.leases.pop(job_id, None)
+
+    def get(self, job_id: str) -> Job | None:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def pending(self) -> list[Job]:
+        with self.lock:
+            return [job for job in self.jobs.values() if job.status in (STATUS_QUEUED, STATUS_RUNNING)]
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Очередь в файле SQLite на общем хранилище (NFS/SMB), доступная с нескольких узлов.
+    Используется журнал DELETE вместо WAL: WAL не работает через сетевые файловые системы.
+    Захват задачи делается в транзакции BEGIN IMMEDIATE, поэтому два воркера не возьмут одну задачу.
+    """
+
+    def __init__(self, path: Path, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=DELETE")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT, "
+                "worker_id TEXT, lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    @contextmanager
+    def connect(self):
+        # Соединение на каждую операцию: очередь используется из разных потоков и процессов
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        try:
+            yield connection
+
+        finally:
+            connection.close()
+
+    @staticmethod
+    def row_to_job(row: sqlite3.Row) -> Job:
+        return Job(row["id"], row["status"], json.loads(row["payload"]),
+                   json.loads(row["result"]) if row["result"] else None, row["error"], row["attempts"],
+                   row["created_at"])
+
+    def enqueue(self, payload: dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, STATUS_QUEUED, json.dumps(payload, ensure_ascii=False), now, now)
+            )
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> Job | None:
+        now = time.time()
+        with self.connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.claim_row(connection, worker_id, lease_seconds, now)
+                connection.execute("COMMIT")
+
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+
+        job = self.row_to_job(row)
+        job.status = STATUS_RUNNING
+        job.attempts += 1
+        return job
+
+    def claim_row(self, connection: sqlite3.Connection, worker_id: str, lease_seconds: int,
+                  now: float) -> sqlite3.Row | None:
+        # Задачи упавших воркеров с исчерпанными попытками больше не выдаются
+        connection.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+            "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+            (STATUS_FAILED, "Превышено число попыток обработки", now, STATUS_RUNNING, now, self.max_attempts)
+        )
+        row = connection.execute(
+            "SELECT * FROM jobs WHERE status = ? OR (status = ? AND lease_until < ?) "
+            "ORDER BY created_at LIMIT 1",
+            (STATUS_QUEUED, STATUS_RUNNING, now)
+        ).fetchone()
+
+        if row is not None:
+            connection.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, lease_until = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (STATUS_RUNNING, worker_id, now + lease_seconds, now, row["id"])
+            )
+
+        return row
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+        now = time.time()
+        with self.connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (now + lease_seconds, now, job_id, worker_id, STATUS_RUNNING)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: dict) -> None:
+        with self.connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, result = ?, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ?",
+                (STATUS_DONE, json.dumps(result, ensure_ascii=False), time.time(), job_id, worker_id)
+            )
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        with self.connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ?",
+                (STATUS_FAILED, error, time.time(), job_id, worker_id)
+            )
+
+    def get(self, job_id: str) -> Job | None:
+        with self.connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self.row_to_job(row) if row else None
+
+    def pending(self) -> list[Job]:
+        with self.connect() as connection:
+            rows = connection.execute("SELECT * FROM jobs WHERE status IN (?, ?)",
+                                      (STATUS_QUEUED, STATUS_RUNNING)).fetchall()
+        return [self.row_to_job(row) for row in rows]
+
+
+def make_job_queue(path: Path | str | None) -> JobQueue | None:
+    # None - распределённый режим выключен, обработка идёт прямо в веб-процессе
+    if path is None:
+        return None
+
+    if str(path) == ":local:":
+        return LocalJobQueue()
+
+    return SQLiteJobQueue(Path(path))
@@ -0,0 +1,122 @@
+from typing import Iterator, NamedTuple
+
+import settings
+from common.constants import PRODUCT_NAMES, SYNONYMS
+
+PRODUCT = "product"
+CHARACTERISTIC = "characteristic"
+
+
+class Hit(NamedTuple):
+    start: int
+    end: int
+    keyword: str
+    kind: str
+    # Исходное название товара или ключ SYNONYMS, к которому относится синоним
+    value: str
+
+
+class KeywordAutomaton:
+    """
+    Автомат Ахо-Корасик: все ключевые слова ищутся за один проход по тексту.
+    Поиск регистронезависимый, текст приводится к нижнему регистру один раз.
+    Слова добавляются через add(), после чего автомат собирается build().
+    """
+
+    def __init__(self):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.output: list[list[int]] = [[]]
+        self.keywords: list[tuple[str, str, str]] = []
+        self.known: set[tuple[str, str]] = set()
+        self.max_length = 0
+
+    def add(self, keyword: str, kind: str, value: str) -> None:
+        keyword = keyword.lower()
+        if not keyword or (keyword, kind) in self.known:
+            return
+        self.known.add((keyword, kind))
+
+        state = 0
+        for char in keyword:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+
+        self.output[state].append(len(self.keywords))
+        self.keywords.append((keyword, kind, value))
+        self.max_length = max(self.max_length, len(keyword))
+
+    def build(self) -> "KeywordAutomaton":
+        # Ссылки неудач строятся обходом в ширину; у детей корня они ведут в корень
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+        return self
+
+    def iter_hits(self, text: str, kind: str | None = None) -> Iterator[Hit]:
+        # Совпадения в порядке их окончания в тексте; kind=None - слова всех видов
+        if not text:
+            return
+
+        state = 0
+        for position, char in enumerate(text.lower()):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+
+            for index in self.output[state]:
+                keyword, keyword_kind, value = self.keywords[index]
+                if kind is None or keyword_kind == kind:
+                    yield Hit(position - len(keyword) + 1, position + 1, keyword, keyword_kind, value)
+
+    def find_all(self, text: str, kind: str | None = None) -> list[Hit]:
+        return list(self.iter_hits(text, kind))
+
+    def contains(self, text: str, kind: str | None = None) -> bool:
+        return next(self.iter_hits(text, kind), None) is not None
+
+    def starts_with(self, text: str, kind: str | None = None) -> bool:
+        # Совпадение с начала строки не длиннее самого длинного слова, дальше искать незачем
+        return any(hit.start == 0 for hit in self.iter_hits(text[:self.max_length], kind))
+
+    def first_hits(self, text: str, kind: str | None = None) -> dict[str, Hit]:
+        # Первое вхождение каждого значения в порядке появления в тексте
+        hits: dict[str, Hit] = {}
+        for hit in sorted(self.iter_hits(text, kind)):
+            hits.setdefault(hit.value, hit)
+        return hits
+
+    def keywords_of(self, kind: str) -> tuple[str, ...]:
+        # Слова одного вида в нижнем регистре, например для Series.str.startswith
+        return tuple(keyword for keyword, keyword_kind, _ in self.keywords if keyword_kind == kind)
+
+    def contains_product_name(self, text: str) -> bool:
+        return self.contains(text, PRODUCT)
+
+    def starts_with_product_name(self, text: str) -> bool:
+        return self.starts_with(text, PRODUCT)
+
+
+def build_keyword_automaton(product_names: list[str], synonyms: dict[str, list[str]]) -> KeywordAutomaton:
+    automaton = KeywordAutomaton()
+    for name in product_names:
+        automaton.add(name, PRODUCT, name)
+    for key, variants in synonyms.items():
+        for variant in (key, *variants):
+            automaton.add(variant, CHARACTERISTIC, key)
+    return automaton.build()
+
+
+# Названия товаров из настроек и из констант объединяются в один список без повторов
+KEYWORDS = build_keyword_automaton(list(dict.fromkeys([*settings.product_names, *PRODUCT_NAMES])), SYNONYMS)
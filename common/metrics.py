@@ -0,0 +1,203 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Границы корзин гистограмм: секунды этапов, байты загрузок, токены в секунду
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = (16 * 1024, 64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2)
+RATE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def format_labels(labelnames: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def label_values(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def drain(self) -> dict:
+        # Накопленные значения с обнулением (передаются из процесса пула в основной процесс)
+        with self.lock:
+            values, self.values = self.values, {}
+        return values
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self.label_values(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def merge(self, values: dict) -> None:
+        with self.lock:
+            for key, value in values.items():
+                self.values[key] = self.values.get(key, 0) + value
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self.lock:
+            for key, value in self.values.items():
+                lines.append(f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = SECONDS_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # ключ меток -> [счётчики корзин, сумма, количество]
+        self.values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self.label_values(labels)
+        with self.lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = [counts, total + value, count + 1]
+
+    def merge(self, values: dict) -> None:
+        with self.lock:
+            for key, (counts, total, count) in values.items():
+                if key in self.values:
+                    own_counts, own_total, own_count = self.values[key]
+                    counts = [a + b for a, b in zip(own_counts, counts)]
+                    total, count = own_total + total, own_count + count
+                self.values[key] = [list(counts), total, count]
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self.lock:
+            for key, (counts, total, count) in self.values.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = format_labels(self.labelnames, key, f'le="{format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+REGISTRY: list[Metric] = []
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def drain_metrics() -> dict[str, dict]:
+    return {metric.name: values for metric in REGISTRY if (values := metric.drain())}
+
+
+def merge_metrics(values: dict[str, dict]) -> None:
+    for metric in REGISTRY:
+        if metric.name in values:
+            metric.merge(values[metric.name])
+
+
+def run_with_metrics(function, *args):
+    """
+    Обёртка задачи процесса пула: метрики, записанные в процессе пула, иначе не попали бы в /metrics.
+    Возвращает (результат, метрики задачи); основной процесс передаёт метрики в merge_metrics.
+    Перед задачей значения обнуляются: при fork процесс пула получает копию значений родителя.
+    """
+    drain_metrics()
+    return function(*args), drain_metrics()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def serve_metrics(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    # /metrics процесса без веб-приложения (воркер распределённого режима), в фоновом потоке
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Метрики процесса: http://{host}:{port}/metrics")
+    return server
+
+
+# Метрики конвейера: загрузка -> парсинг -> LLM -> запись Excel
+UPLOAD_SIZE = Histogram("docs_upload_size_bytes", "Размер загруженных файлов", ("ext",), BYTES_BUCKETS)
+PARSE_SECONDS = Histogram("docs_parse_seconds", "Время парсинга файла", ("parser",))
+DOC_CONVERSION_SECONDS = Histogram("docs_doc_conversion_seconds", "Время конвертации .doc в .docx")
+EXCEL_WRITE_SECONDS = Histogram("docs_excel_write_seconds", "Время записи выходной книги Excel")
+QUEUE_WAIT_SECONDS = Histogram("docs_queue_wait_seconds", "Время ожидания задачи в очереди")
+
+LLM_LOAD_SECONDS = Histogram("docs_llm_load_seconds", "Время загрузки модели")
+LLM_PROMPT_TOKENS = Counter("docs_llm_prompt_tokens_total", "Токены промпта", ("model",))
+LLM_COMPLETION_TOKENS = Counter("docs_llm_completion_tokens_total", "Сгенерированные токены", ("model",))
+LLM_PREFILL_TPS = Histogram("docs_llm_prefill_tokens_per_second", "Скорость обработки промпта", ("model",),
+                            RATE_BUCKETS)
+LLM_DECODE_TPS = Histogram("docs_llm_decode_tokens_per_second", "Скорость генерации", ("model",), RATE_BUCKETS)
+LLM_JSON_FAILURES = Counter("docs_llm_json_failures_total", "Ответы модели, не разобранные как JSON", ("model",))
+
+CACHE_REQUESTS = Counter("docs_cache_requests_total", "Обращения к кешам", ("cache", "result"))
+
+PDF_PAGES = Counter("docs_pdf_pages_total", "Страницы PDF по решению предварительной проверки", ("decision",))
+PDF_PAGE_SECONDS = Histogram("docs_pdf_page_seconds", "Время обработки страницы PDF", ("decision",))
+
+PARSER_STRATEGY = Counter("docs_parser_strategy_total", "Стратегии парсинга, выбранные для файлов", ("strategy",))
+STRATEGY_SELECTION_SECONDS = Histogram("docs_strategy_selection_seconds", "Время выбора стратегии по выборке")
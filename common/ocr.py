@@ -0,0 +1,82 @@
+import hashlib
+from functools import lru_cache
+
+import settings
+from common.cache import OcrCache
+from common.constants import PDF_OCR_CELL_GAP
+
+try:
+    import pytesseract
+
+except ImportError:
+    pytesseract = None
+
+if pytesseract is not None and settings.tesseract_cmd:
+    pytesseract.pytesseract.tesseract_cmd = settings.tesseract_cmd
+
+
+@lru_cache(maxsize=1)
+def is_available() -> bool:
+    # Нужны и пакет pytesseract, и исполняемый файл tesseract
+    if pytesseract is None:
+        return False
+    try:
+        pytesseract.get_tesseract_version()
+
+    except pytesseract.TesseractNotFoundError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> OcrCache:
+    # Открывается один раз на процесс (в пуле - в каждом обработчике)
+    return OcrCache()
+
+
+def image_key(image) -> str:
+    # Хеш пикселей страницы и языков распознавания: одинаковый скан распознаётся один раз
+    digest = hashlib.sha256(f"{image.mode}:{image.size}:{settings.ocr_languages}".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def recognize_rows(image) -> list[list[str | None]]:
+    """
+    Распознаёт изображение страницы и собирает слова в строки таблицы.
+    --psm 6 читает страницу как один блок, поэтому строка таблицы остаётся одной строкой текста;
+    слова строки, между которыми разрыв больше PDF_OCR_CELL_GAP высот строки, попадают в разные ячейки.
+    Строки дополняются None до одной ширины, как у extract_table().
+    """
+    data = pytesseract.image_to_data(image, lang=settings.ocr_languages, config="--psm 6",
+                                     output_type=pytesseract.Output.DICT)
+    lines = {}
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        if not word or float(data["conf"][i]) < 0:
+            continue
+        line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(line, []).append((data["left"][i], data["width"][i], data["height"][i], word))
+
+    rows = []
+    for words in lines.values():
+        words.sort()
+        cells = [[words[0][3]]]
+        for prev, (left, width, height, word) in zip(words, words[1:]):
+            if left - (prev[0] + prev[1]) > PDF_OCR_CELL_GAP * max(height, prev[2]):
+                cells.append([word])
+            else:
+                cells[-1].append(word)
+        rows.append([" ".join(cell) for cell in cells])
+
+    width = max(map(len, rows), default=0)
+    return [row + [None] * (width - len(row)) for row in rows]
+
+
+def ocr_image(image) -> list[list[str | None]]:
+    key = image_key(image)
+    rows = get_cache().get(key)
+    if rows is None:
+        rows = recognize_rows(image)
+        get_cache().put(key, rows)
+    return rows
@@ -0,0 +1,87 @@
+import re
+from typing import Iterable, Iterator
+
+from common.constants import PARAGRAPH_BLOCK_MAX_PARAGRAPHS
+from common.keywords import KEYWORDS
+from common.segmentation import Segment, SegmentRules, segment_rows
+
+# Нумерация пунктов ТЗ: "2", "2.5", "2.5.1" с точкой или скобкой после номера
+NUMBERING = re.compile(r"^(\d+(?:\.\d+)*)[.)]?\s+")
+BULLET = re.compile(r"^[-–—•·*]\s*")
+# Пункт о гарантии обычно последний в описании товара
+BLOCK_END = "гарантия"
+
+
+def split_numbering(text: str) -> tuple[int | None, str]:
+    # Уровень нумерации ("2.5" - 2, "2.5.1" - 3) и текст без номера и маркера списка
+    match = NUMBERING.match(text)
+    level = match.group(1).count(".") + 1 if match else None
+    body = text[match.end():] if match else text
+    return level, BULLET.sub("", body, count=1)
+
+
+class ParagraphRules(SegmentRules):
+    """
+    Свободный текст ТЗ: описания товаров в абзацах.
+    Начало товара - абзац, который начинается с наименования (после номера и маркера списка),
+    или пронумерованный абзац уровня товара ("2.5", как в parse_table_type1) с наименованием внутри.
+    Пока уровень товаров не закреплён, более глубокий пункт с наименованием тоже начинает товар
+    и переносит уровень на себя, а предыдущий пункт без описания считается заголовком раздела
+    ("1. Поставка светильников") и товаром не становится. Уровень закрепляется, когда на нём
+    встретились два товара подряд.
+    Описание заканчивается на следующем товаре, на пункте того же или более высокого уровня
+    нумерации, после абзаца с "гарантия" или через PARAGRAPH_BLOCK_MAX_PARAGRAPHS абзацев.
+    """
+
+    def __init__(self, max_paragraphs: int = PARAGRAPH_BLOCK_MAX_PARAGRAPHS):
+        self.max_lines = max_paragraphs
+        # Уровень нумерации товаров и закреплён ли он (два соседних товара на одном уровне)
+        self.product_level: int | None = None
+        self.level_fixed = False
+        # Уровень нумерации текущего товара и признак, что он оказался заголовком раздела
+        self.current_level: int | None = None
+        self.heading = False
+
+    def line(self, paragraph: str) -> str | None:
+        return paragraph.strip() or None
+
+    def is_start(self, text: str) -> bool:
+        level, body = split_numbering(text)
+        if KEYWORDS.starts_with_product_name(body):
+            start = True
+        elif level is None or self.level_fixed and level != self.product_level:
+            start = False
+        else:
+            start = KEYWORDS.contains_product_name(body)
+
+        # Товар глубже текущего до закрепления уровня: текущий пункт - заголовок раздела
+        self.heading = (start and not self.level_fixed and level is not None
+                        and self.current_level is not None and level > self.current_level)
+        return start
+
+    def on_start(self, text: str) -> None:
+        level, _ = split_numbering(text)
+        self.current_level = level
+        self.heading = False
+        if level is None or self.level_fixed:
+            return
+        if level == self.product_level:
+            self.level_fixed = True
+        else:
+            self.product_level = level
+
+    def is_break(self, text: str) -> bool:
+        # Следующий пункт того же уровня, что и товары, - уже не описание товара
+        level, _ = split_numbering(text)
+        return level is not None and self.product_level is not None and level <= self.product_level
+
+    def keep(self, segment: Segment) -> bool:
+        # Заголовок раздела без описания - не товар
+        return not (self.heading and len(segment.lines) == 1)
+
+    def is_last(self, text: str) -> bool:
+        return BLOCK_END in text.lower()
+
+
+def segment_paragraphs(paragraphs: Iterable[str]) -> Iterator[Segment]:
+    return segment_rows(paragraphs, ParagraphRules())
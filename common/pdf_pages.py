@@ -0,0 +1,228 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+import pdfplumber
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+
+import settings
+from common import ocr
+from common.constants import PDF_OCR_DPI, PDF_PARALLEL_MIN_PAGES, PDF_PAGES_PER_TASK
+from common.keywords import KEYWORDS
+from common.metrics import PDF_PAGES, PDF_PAGE_SECONDS, merge_metrics, run_with_metrics
+
+# Решения предварительной проверки страницы
+PAGE_TABLE = "table"
+PAGE_TEXT = "text"
+PAGE_SKIP = "skip"
+PAGE_OCR = "ocr"
+
+
+class PageTables(NamedTuple):
+    page_number: int
+    tables: list[list[list[str | None]]]
+    decision: str
+    seconds: float
+    # Текст страницы без таблиц (решение PAGE_TEXT); в таблицы он не попадает
+    text: str | None = None
+
+
+def screen_page(pdfium_page) -> tuple[str, str | None]:
+    """
+    Дешёвая проверка страницы через pdfium до разбора её pdfplumber (разбор раскладки pdfminer -
+    самая дорогая часть, ~100 мс на страницу). Возвращает (решение, текст страницы или None).
+    Таблицы pdfplumber по умолчанию строятся по линиям, прямоугольникам и кривым, то есть
+    по векторным путям: без них таблиц на странице не найдётся и extract_table не нужен.
+    Страница без путей, но с названием товара в тексте, отдаётся только текстом (PageTables.text):
+    таблиц в ней нет, и табличные стратегии её пропускают, как и без проверки.
+    Страница без текстового слоя (скан) уходит в OCR, пустая страница и текст без товаров пропускаются.
+    """
+    textpage = pdfium_page.get_textpage()
+    try:
+        if not textpage.count_chars():
+            return (PAGE_OCR if has_images(pdfium_page) else PAGE_SKIP), None
+        if next(pdfium_page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH]), None) is not None:
+            return PAGE_TABLE, None
+
+        text = textpage.get_text_range()
+        if KEYWORDS.contains_product_name(text):
+            return PAGE_TEXT, text
+        return PAGE_SKIP, None
+
+    finally:
+        textpage.close()
+
+
+def has_images(pdfium_page) -> bool:
+    return next(pdfium_page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE]), None) is not None
+
+
+def is_scanned(pdfium_page) -> bool:
+    # Нет ни одного символа в текстовом слое, но есть изображения - страница отсканирована
+    textpage = pdfium_page.get_textpage()
+    try:
+        return not textpage.count_chars() and has_images(pdfium_page)
+
+    finally:
+        textpage.close()
+
+
+def ocr_page(pdfium_page) -> list[list[str | None]]:
+    image = pdfium_page.render(scale=PDF_OCR_DPI / 72, grayscale=True).to_pil()
+    return ocr.ocr_image(image)
+
+
+def resolve_workers(workers: int | None = None) -> int:
+    workers = settings.pdf_workers if workers is None else workers
+    return workers or os.cpu_count() or 1
+
+
+def iter_pages(path_to_file: Path, page_numbers: list[int] | None, all_tables: bool,
+               prescreen: bool = True, use_ocr: bool = False) -> Iterator[PageTables]:
+    # all_tables=False - только самая крупная таблица страницы, как extract_table()
+    with pdfplumber.open(path_to_file, pages=page_numbers) as pdf:
+        pdfium_pdf = pdfium.PdfDocument(path_to_file) if prescreen or use_ocr else None
+        try:
+            for page in pdf.pages:
+                start = time.perf_counter()
+                ocr_rows = None
+                if pdfium_pdf is None:
+                    decision, text = PAGE_TABLE, None
+                else:
+                    pdfium_page = pdfium_pdf[page.page_number - 1]
+                    try:
+                        if prescreen:
+                            decision, text = screen_page(pdfium_page)
+                        else:
+                            decision, text = (PAGE_OCR if is_scanned(pdfium_page) else PAGE_TABLE), None
+                        if decision == PAGE_OCR and use_ocr:
+                            ocr_rows = ocr_page(pdfium_page)
+
+                    finally:
+                        pdfium_page.close()
+
+                if decision == PAGE_OCR:
+                    # Распознанные строки идут дальше как обычная таблица страницы
+                    tables = [ocr_rows] if ocr_rows else []
+                elif decision in (PAGE_TEXT, PAGE_SKIP):
+                    # Без векторных путей pdfplumber таблиц не найдёт; текст страницы остаётся в PageTables.text
+                    tables = []
+                elif all_tables:
+                    tables = page.extract_tables()
+                else:
+                    table = page.extract_table()
+                    tables = [table] if table is not None else []
+
+                yield PageTables(page.page_number, tables, decision, time.perf_counter() - start, text)
+                # Без этого pdfplumber держит разобранные объекты всех страниц до закрытия файла
+                page.close()
+
+        finally:
+            if pdfium_pdf is not None:
+                pdfium_pdf.close()
+
+
+def extract_pages(path_to_file: Path, page_numbers: list[int], all_tables: bool,
+                  prescreen: bool, use_ocr: bool) -> list[PageTables]:
+    # Выполняется в процессе-обработчике: файл открывается заново, разбираются только свои страницы
+    return list(iter_pages(path_to_file, page_numbers, all_tables, prescreen, use_ocr))
+
+
+def count_scanned_pages(path_to_file: Path, page_count: int) -> int:
+    # Быстрый проход pdfium без разбора раскладки: сколько из первых page_count страниц придётся распознавать
+    pdfium_pdf = pdfium.PdfDocument(path_to_file)
+    try:
+        count = 0
+        for index in range(page_count):
+            pdfium_page = pdfium_pdf[index]
+            try:
+                count += is_scanned(pdfium_page)
+
+            finally:
+                pdfium_page.close()
+        return count
+
+    finally:
+        pdfium_pdf.close()
+
+
+def iter_page_tables(path_to_file: Path, all_tables: bool = True, workers: int | None = None,
+                     prescreen: bool | None = None, use_ocr: bool | None = None,
+                     max_pages: int | None = None) -> Iterator[PageTables]:
+    """
+    Таблицы PDF по страницам в порядке страниц.
+    Поиск таблиц pdfplumber - чистый Python и упирается в процессор, поэтому для больших файлов
+    страницы делятся на задачи по PDF_PAGES_PER_TASK и разбираются в пуле процессов.
+    Страницы без текстового слоя распознаются Tesseract (settings.pdf_ocr) в тех же процессах;
+    короткий скан тоже разбирается в пуле, если в нём больше одной такой страницы.
+    Состояние, переходящее между страницами (текущий товар, переносы), остаётся у вызывающего:
+    он получает страницы строго по порядку, как при последовательном чтении.
+    Решение предварительной проверки и время каждой страницы пишутся в метрики и в сводку.
+    Это генератор: страница освобождается сразу после обработки, в памяти - одна страница
+    (или несколько задач пула), а не весь документ.
+    max_pages - разбираются только первые страницы (выборка для оценки стратегий).
+    """
+    workers = resolve_workers(workers)
+    prescreen = settings.pdf_prescreen if prescreen is None else prescreen
+    use_ocr = settings.pdf_ocr if use_ocr is None else use_ocr
+    if use_ocr and not ocr.is_available():
+        print("OCR недоступен (нужны pytesseract и tesseract), страницы без текстового слоя будут пропущены")
+        use_ocr = False
+
+    with pdfplumber.open(path_to_file) as pdf:
+        page_count = len(pdf.pages)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+    page_numbers = list(range(1, page_count + 1))
+
+    parallel = workers > 1 and (page_count >= PDF_PARALLEL_MIN_PAGES
+                                or use_ocr and count_scanned_pages(path_to_file, page_count) > 1)
+    if not parallel:
+        pages = iter_pages(path_to_file, page_numbers if max_pages is not None else None, all_tables,
+                           prescreen, use_ocr)
+    else:
+        chunk_size = max(1, min(PDF_PAGES_PER_TASK, -(-page_count // workers)))
+        chunks = [page_numbers[i:i + chunk_size] for i in range(0, page_count, chunk_size)]
+        pages = iter_pool_pages(path_to_file, chunks, all_tables, prescreen, use_ocr, min(workers, len(chunks)))
+
+    summary = {PAGE_TABLE: 0, PAGE_TEXT: 0, PAGE_OCR: 0, PAGE_SKIP: 0}
+    start = time.perf_counter()
+    for page in pages:
+        PDF_PAGES.inc(decision=page.decision)
+        PDF_PAGE_SECONDS.observe(page.seconds, decision=page.decision)
+        summary[page.decision] += 1
+        yield page
+
+    print(f"{Path(path_to_file).name}: страниц {page_count}, с таблицами {summary[PAGE_TABLE]}, "
+          f"текстом {summary[PAGE_TEXT]}, сканов {summary[PAGE_OCR]}, пропущено {summary[PAGE_SKIP]} "
+          f"за {time.perf_counter() - start:.2f} с")
+
+
+def init_worker() -> None:
+    # Tesseract сам распараллеливается через OpenMP; в пуле процессов это только мешает
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def iter_pool_pages(path_to_file: Path, chunks: list[list[int]], all_tables: bool, prescreen: bool,
+                    use_ocr: bool, workers: int) -> Iterator[PageTables]:
+    # В работе не больше двух задач на процесс: готовые страницы не копятся, пока вызывающий их разбирает
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        pending = deque()
+        chunks = iter(chunks)
+        for chunk in islice(chunks, workers * 2):
+            pending.append(executor.submit(run_with_metrics, extract_pages, path_to_file, chunk, all_tables,
+                                           prescreen, use_ocr))
+
+        while pending:
+            results, values = pending.popleft().result()
+            merge_metrics(values)
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(executor.submit(run_with_metrics, extract_pages, path_to_file, chunk, all_tables,
+                                               prescreen, use_ocr))
+            yield from results
@@ -0,0 +1,131 @@
+import cProfile
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+SAMPLE_INTERVAL = 0.005
+
+# tracemalloc и cProfile - состояние всего процесса: профилируемые этапы разных потоков идут по очереди
+STAGE_LOCK = threading.Lock()
+
+
+class StackSampler(threading.Thread):
+    """
+    Сэмплирующий профайлер одного потока: каждые interval секунд снимает стек потока
+    и считает одинаковые стеки. Результат - свёрнутые стеки для flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, thread_id: int, prefix: str, interval: float = SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.prefix = prefix
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(self.prefix)
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Counter[str]:
+        self.stopped.set()
+        self.join()
+        return self.stacks
+
+
+class Profiler:
+    """
+    Профилирование этапов конвейера (парсинг, извлечение, запись Excel) по запросу.
+    Для каждого этапа снимаются cProfile, сэмплы стеков и пик памяти tracemalloc.
+    Выключенный профайлер ничего не делает, поэтому stage() можно оставлять в коде всегда.
+    Два cProfile одновременно в процессе не работают, а reset_peak/stop одного этапа сбили бы
+    пик памяти другого, поэтому профилируемые этапы всех потоков выполняются по очереди (STAGE_LOCK).
+    Вложенные stage() не поддерживаются.
+    """
+
+    def __init__(self, enabled: bool = False, sample_interval: float = SAMPLE_INTERVAL):
+        self.enabled = enabled
+        self.sample_interval = sample_interval
+        self.profiles: dict[str, cProfile.Profile] = {}
+        self.stacks: Counter[str] = Counter()
+        self.summary: dict[str, dict] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        with STAGE_LOCK:
+            started_tracemalloc = not tracemalloc.is_tracing()
+            if started_tracemalloc:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+
+            sampler = StackSampler(threading.get_ident(), name, self.sample_interval)
+            profile = cProfile.Profile()
+            sampler.start()
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                yield
+
+            finally:
+                profile.disable()
+                wall = time.perf_counter() - start
+                self.stacks.update(sampler.stop())
+                _, memory_peak = tracemalloc.get_traced_memory()
+                if started_tracemalloc:
+                    tracemalloc.stop()
+
+                self.profiles[name] = profile
+                self.summary[name] = {
+                    "wall_seconds": round(wall, 6),
+                    "memory_peak_bytes": memory_peak,
+                    "memory_peak_delta_bytes": memory_peak - memory_before,
+                }
+                print(f"Профиль этапа {name}: {wall:.3f} с, пик памяти {memory_peak / 1024 / 1024:.1f} МБ")
+
+    def save(self, output_dir: Path, prefix: str) -> list[Path]:
+        """
+        Сохраняет рядом с результатом:
+        {prefix}.{этап}.prof - статистика cProfile (snakeviz, gprof2dot),
+        {prefix}.folded - свёрнутые стеки всех этапов (flamegraph.pl, speedscope),
+        {prefix}.profile.json - время и пик памяти по этапам.
+        """
+        if not self.enabled:
+            return []
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+
+        for name, profile in self.profiles.items():
+            path = output_dir / f"{prefix}.{name}.prof"
+            profile.dump_stats(path)
+            paths.append(path)
+
+        path = output_dir / f"{prefix}.folded"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.items()), encoding="utf-8")
+        paths.append(path)
+
+        path = output_dir / f"{prefix}.profile.json"
+        path.write_text(json.dumps(self.summary, ensure_ascii=False, indent=2), encoding="utf-8")
+        paths.append(path)
+
+        return paths
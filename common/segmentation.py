@@ -0,0 +1,142 @@
+from typing import Iterable, Iterator, NamedTuple
+
+
+class Segment(NamedTuple):
+    # name=None - строки до первого товара (если правила их сохраняют)
+    name: str | None
+    lines: list
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.lines)
+
+
+class SegmentRules:
+    """
+    Правила сегментации строк на товары; наследники переопределяют нужное.
+    line() превращает строку источника (ячейку, строку таблицы, абзац) в строку товара
+    или None, если строку надо пропустить. Строка-начало открывает новый товар;
+    is_break закрывает текущий товар без этой строки, is_last - вместе с ней;
+    accepts решает, войдёт ли строка-продолжение в товар, keep - отдавать ли закрытый товар.
+    """
+    # Строка-начало входит в lines товара
+    include_start = True
+    # Строки до первого товара отдаются отдельным сегментом с name=None
+    keep_head = False
+    # Товар закрывается, набрав столько строк
+    max_lines: int | None = None
+
+    def line(self, row):
+        return row
+
+    def is_start(self, line) -> bool:
+        return False
+
+    def name(self, line) -> str:
+        return line
+
+    def is_break(self, line) -> bool:
+        return False
+
+    def accepts(self, line) -> bool:
+        return True
+
+    def is_last(self, line) -> bool:
+        return False
+
+    def on_start(self, line) -> None:
+        pass
+
+    def keep(self, segment: Segment) -> bool:
+        return True
+
+
+class RowSegmenter:
+    """
+    Потоковая сегментация: feed() принимает строки по одной и отдаёт товары, как только они закрыты,
+    close() закрывает последний (в конце таблицы, листа или документа).
+    В памяти только текущий товар. Общий движок для Excel, DOCX, PDF и свободного текста.
+    """
+
+    def __init__(self, rules: SegmentRules):
+        self.rules = rules
+        self.current: Segment | None = None
+        self.head: list | None = [] if rules.keep_head else None
+
+    def start(self, line) -> Iterator[Segment]:
+        yield from self.close_current()
+        self.head = None
+        self.rules.on_start(line)
+        self.current = Segment(self.rules.name(line), [line] if self.rules.include_start else [])
+
+    def feed(self, row) -> Iterator[Segment]:
+        rules = self.rules
+        line = rules.line(row)
+        if line is None:
+            return
+
+        if rules.is_start(line):
+            yield from self.start(line)
+        elif self.current is None:
+            if self.head is not None:
+                self.head.append(line)
+            return
+        elif rules.is_break(line):
+            yield from self.close_current()
+            return
+        elif rules.accepts(line):
+            self.current.lines.append(line)
+        else:
+            return
+
+        if rules.is_last(line) or rules.max_lines is not None and len(self.current.lines) >= rules.max_lines:
+            yield from self.close_current()
+
+    def feed_block(self, lines: list, starts: list[int]) -> Iterator[Segment]:
+        """
+        Быстрый путь для правил без is_break/accepts/is_last/keep/max_lines: lines - строки куска,
+        starts - номера строк-начал, посчитанные заранее (например, векторно в pandas).
+        Товары внутри куска собираются срезами, последний остаётся открытым до следующего куска.
+        """
+        if not starts:
+            if self.current is not None:
+                self.current.lines.extend(lines)
+            elif self.head is not None:
+                self.head.extend(lines)
+            return
+
+        head = lines[:starts[0]]
+        if self.current is not None:
+            self.current.lines.extend(head)
+        elif self.head is not None:
+            self.head.extend(head)
+
+        yield from self.close_current()
+        rules = self.rules
+        skip = 0 if rules.include_start else 1
+        for a, b in zip(starts, starts[1:]):
+            rules.on_start(lines[a])
+            yield Segment(rules.name(lines[a]), lines[a + skip:b])
+        rules.on_start(lines[starts[-1]])
+        self.current = Segment(rules.name(lines[starts[-1]]), lines[starts[-1] + skip:])
+
+    def close_current(self) -> Iterator[Segment]:
+        if self.head:
+            yield Segment(None, self.head)
+        self.head = None
+        if self.current is not None:
+            if self.rules.keep(self.current):
+                yield self.current
+            self.current = None
+
+    def close(self) -> Iterator[Segment]:
+        # Конец таблицы/листа: отдаёт незакрытое и готовит движок к следующему источнику
+        yield from self.close_current()
+        self.head = [] if self.rules.keep_head else None
+
+
+def segment_rows(rows: Iterable, rules: SegmentRules) -> Iterator[Segment]:
+    segmenter = RowSegmenter(rules)
+    for row in rows:
+        yield from segmenter.feed(row)
+    yield from segmenter.close()
@@ -0,0 +1,175 @@
+import os
+import re
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+from common.constants import DIR_UPLOADS, DIR_DOWNLOADS, STORAGE_MAX_AGE_DAYS, STORAGE_MAX_SIZE, STORAGE_TMP_GRACE
+
+# Имена файлов начинаются с метки времени generate_filename: "2025-02-19-11-19-07-..."
+SHARD_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})-")
+TMP_MARKER = ".tmp-"
+
+
+def shard_path(root: Path, filename: str) -> Path:
+    """
+    Путь файла в подкаталоге-шарде по дате из имени: uploads/2025-02-19/2025-02-19-11-19-07-ТЗ.doc.
+    Каталоги не разрастаются до десятков тысяч файлов, а старые дни удаляются целиком.
+    Имена без метки времени остаются в корне (старые файлы до шардирования).
+    """
+    match = SHARD_PATTERN.match(filename)
+    if match is None:
+        return root / filename
+
+    return root / match.group(1) / filename
+
+
+def make_shard_path(root: Path, filename: str) -> Path:
+    path = shard_path(root, filename)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def find_stored_file(root: Path, filename: str) -> Path | None:
+    # Защита от выхода за пределы каталога через "../"
+    if Path(filename).name != filename:
+        return None
+
+    for path in (shard_path(root, filename), root / filename):
+        if path.is_file():
+            return path
+
+    return None
+
+
+def tmp_path_for(path: Path) -> Path:
+    # Расширение сохраняется: pandas/openpyxl выбирают формат по суффиксу
+    return path.with_name(f"{path.stem}{TMP_MARKER}{uuid.uuid4().hex[:8]}{path.suffix}")
+
+
+@contextmanager
+def atomic_path(path: Path):
+    """
+    Отдаёт временный путь рядом с path; после успешной записи файл атомарно переименовывается в path.
+    Недописанный файл никогда не виден под итоговым именем, при ошибке временный файл удаляется.
+    """
+    # Пустой шард мог быть удалён очисткой между make_shard_path и записью
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_path_for(path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class StorageManager:
+    """
+    Обслуживание каталогов uploads/ и downloads/:
+    удаление файлов старше max_age_days, затем самых старых файлов сверх квоты max_size (на каждый каталог),
+    удаление брошенных временных файлов и пустых шардов.
+    Файлы из protected() (входные файлы задач в очереди) не удаляются,
+    пустые каталоги моложе tmp_grace не трогаются: в них вот-вот запишут загрузку.
+    """
+
+    def __init__(self, roots: tuple[Path, ...] = (DIR_UPLOADS, DIR_DOWNLOADS),
+                 max_age_days: float = STORAGE_MAX_AGE_DAYS, max_size: int = STORAGE_MAX_SIZE,
+                 tmp_grace: float = STORAGE_TMP_GRACE, protected: Callable[[], set[Path]] | None = None):
+        self.roots = roots
+        self.max_age = max_age_days * 24 * 60 * 60
+        self.max_size = max_size
+        self.tmp_grace = tmp_grace
+        self.protected = protected
+
+    @staticmethod
+    def scan(root: Path) -> list[tuple[Path, os.stat_result]]:
+        if not root.exists():
+            return []
+
+        files = []
+        for path in root.rglob("*"):
+            # Файл мог быть удалён параллельным запросом между обходом и stat
+            try:
+                if path.is_file():
+                    files.append((path, path.stat()))
+
+            except FileNotFoundError:
+                continue
+
+        return files
+
+    def cleanup(self) -> dict[str, int]:
+        now = time.time()
+        removed = {"files": 0, "bytes": 0}
+        protected = {path.resolve() for path in self.protected()} if self.protected is not None else set()
+
+        def remove(path: Path, size: int) -> None:
+            path.unlink(missing_ok=True)
+            removed["files"] += 1
+            removed["bytes"] += size
+
+        for root in self.roots:
+            files = []
+            protected_size = 0
+            for path, stat in self.scan(root):
+                age = now - stat.st_mtime
+                is_tmp = TMP_MARKER in path.name or path.name.endswith(".part")
+                # Защищённые файлы занимают квоту, но вытесняются только остальные
+                if path.resolve() in protected:
+                    protected_size += stat.st_size
+                    continue
+
+                # Временные файлы живут не дольше tmp_grace: это остатки упавших записей
+                if age > self.max_age or (is_tmp and age > self.tmp_grace):
+                    remove(path, stat.st_size)
+                elif not is_tmp:
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = protected_size + sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total_size <= self.max_size:
+                    break
+                remove(path, size)
+                total_size -= size
+
+            self.remove_empty_dirs(root, now - self.tmp_grace)
+
+        print(f"Очистка хранилища: удалено файлов {removed['files']}, освобождено {removed['bytes']} байт")
+        return removed
+
+    @staticmethod
+    def remove_empty_dirs(root: Path, older_than: float) -> None:
+        if not root.exists():
+            return
+
+        # Сначала самые вложенные каталоги, чтобы освобождались и родительские
+        for path in sorted((p for p in root.rglob("*") if p.is_dir()), key=lambda p: len(p.parts), reverse=True):
+            try:
+                if path.stat().st_mtime < older_than:
+                    path.rmdir()
+
+            except OSError:
+                pass
+
+    def report(self) -> dict:
+        report = {}
+        for root in self.roots:
+            files = self.scan(root)
+            mtimes = [stat.st_mtime for _, stat in files]
+            report[root.name] = {
+                "files": len(files),
+                "bytes": sum(stat.st_size for _, stat in files),
+                "shards": len([p for p in root.iterdir() if p.is_dir()]) if root.exists() else 0,
+                "oldest": min(mtimes) if mtimes else None,
+                "newest": max(mtimes) if mtimes else None,
+            }
+
+        usage = shutil.disk_usage(self.roots[0].parent)
+        report["disk"] = {"total": usage.total, "used": usage.used, "free": usage.free}
+        report["quota"] = {"max_age_days": self.max_age / (24 * 60 * 60), "max_size": self.max_size}
+        return report
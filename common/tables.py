@@ -0,0 +1,36 @@
+import sys
+from typing import Iterable, Iterator
+
+
+def intern_cell(value):
+    # Повторяющиеся ячейки (объединённые, "шт.", "да") хранятся одной строкой
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Table:
+    """
+    Таблица документа для BaseParser: строки - кортежи ячеек (str или None) по строкам,
+    без выравнивания по ширине. Заменяет DataFrame там, где таблица только перебирается по ячейкам.
+    header - строка заголовка, если она отделена от данных (таблицы PDF), page - страница PDF.
+    """
+    __slots__ = ("rows", "header", "page", "width")
+
+    def __init__(self, rows: Iterable[Iterable], header: Iterable | None = None, page: int | None = None):
+        self.rows = tuple(tuple(intern_cell(value) for value in row) for row in rows)
+        self.header = tuple(intern_cell(value) for value in header) if header is not None else None
+        self.page = page
+        self.width = max(map(len, self.rows), default=0)
+
+    def __iter__(self) -> Iterator[tuple]:
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __repr__(self) -> str:
+        page = f", page={self.page}" if self.page is not None else ""
+        return f"Table(rows={len(self.rows)}, width={self.width}{page})"
+
+    def cells(self) -> Iterator:
+        for row in self.rows:
+            yield from row
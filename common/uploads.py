@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from common.constants import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_SIZE
+
+# Сигнатуры форматов: OLE2 (.doc/.xls), ZIP (.docx/.xlsx/.xlsm/.ods/.zip), PDF
+MAGIC_OLE2 = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+MAGIC_ZIP = b"PK\x03\x04"
+MAGIC_PDF = b"%PDF"
+
+EXTENSIONS_BY_MAGIC = {
+    MAGIC_OLE2: {".doc", ".xls"},
+    MAGIC_ZIP: {".docx", ".xlsx", ".xlsm", ".ods", ".zip"},
+    MAGIC_PDF: {".pdf"},
+}
+
+
+class UploadRejected(ValueError):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class SavedUpload:
+    def __init__(self, path: Path, size: int, sha256: str, kind: bytes | None):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.kind = kind
+
+
+def sniff_kind(head: bytes) -> bytes | None:
+    if head.startswith(MAGIC_OLE2):
+        return MAGIC_OLE2
+
+    elif head.startswith(MAGIC_ZIP):
+        return MAGIC_ZIP
+
+    # PDF допускает мусор перед сигнатурой, поэтому ищем её в первом килобайте
+    elif MAGIC_PDF in head[:1024]:
+        return MAGIC_PDF
+
+    return None
+
+
+def check_declared_size(file: UploadFile, max_size: int) -> None:
+    # Если клиент передал размер заранее, отклоняем файл до чтения тела
+    if file.size is not None and file.size > max_size:
+        raise UploadRejected(f"Файл больше {max_size // (1024 * 1024)} МБ", status_code=413)
+
+
+async def save_upload(file: UploadFile, destination: Path, max_size: int = UPLOAD_MAX_SIZE,
+                      chunk_size: int = UPLOAD_CHUNK_SIZE) -> SavedUpload:
+    """
+    Потоково сохраняет загруженный файл на диск.
+    Чтение идёт кусками, запись на диск вынесена в поток, чтобы не блокировать event loop.
+    SHA-256 считается по ходу чтения, лимит размера проверяется на каждом куске,
+    тип файла определяется по сигнатуре первого куска и сверяется с расширением.
+    """
+    check_declared_size(file, max_size)
+
+    ext = destination.suffix.lower()
+    part_path = destination.with_name(destination.name + ".part")
+    sha256 = hashlib.sha256()
+    size = 0
+    kind = None
+
+    # Пустой шард мог быть удалён очисткой хранилища после make_shard_path
+    await asyncio.to_thread(destination.parent.mkdir, parents=True, exist_ok=True)
+    buffer = await asyncio.to_thread(open, part_path, "wb")
+    try:
+        while chunk := await file.read(chunk_size):
+            if size == 0:
+                kind = sniff_kind(chunk)
+                if ext not in EXTENSIONS_BY_MAGIC.get(kind, set()):
+                    raise UploadRejected("Содержимое файла не соответствует его расширению", status_code=415)
+
+            size += len(chunk)
+            if size > max_size:
+                raise UploadRejected(f"Файл больше {max_size // (1024 * 1024)} МБ", status_code=413)
+
+            sha256.update(chunk)
+            await asyncio.to_thread(buffer.write, chunk)
+
+        if size == 0:
+            raise UploadRejected("Загружен пустой файл")
+
+    except BaseException:
+        await asyncio.to_thread(buffer.close)
+        part_path.unlink(missing_ok=True)
+        raise
+
+    await asyncio.to_thread(buffer.close)
+    os.replace(part_path, destination)
+
+    return SavedUpload(destination, size, sha256.hexdigest(), kind)
@@ -0,0 +1,258 @@
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import xlrd
+from openpyxl.cell.cell import ERROR_CODES
+
+import settings
+from common.constants import EXCEL_CHUNK_ROWS, EXCEL_EMPTY_ROWS_LIMIT
+
+try:
+    from python_calamine import CalamineWorkbook
+
+except ImportError:
+    CalamineWorkbook = None
+
+
+def convert_xlsx_value(value):
+    # Как у pd.read_excel: целые float -> int, ошибки формул и пустые строки -> пусто
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if value == "" or (isinstance(value, str) and value in ERROR_CODES):
+        return None
+    return value
+
+
+def convert_xls_cell(cell, datemode: int):
+    if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+        return None
+    if cell.ctype == xlrd.XL_CELL_DATE:
+        try:
+            return xlrd.xldate.xldate_as_datetime(cell.value, datemode)
+
+        except xlrd.xldate.XLDateError:
+            return cell.value
+    if cell.ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(cell.value)
+    if cell.ctype == xlrd.XL_CELL_NUMBER and cell.value.is_integer():
+        return int(cell.value)
+    return cell.value or None
+
+
+class WorkbookReader:
+    """
+    Движок чтения книги: open() открывает файл, sheet_names() и read_rows() отдают листы
+    и строки листа как списки значений (пусто - None, целые числа - int).
+    """
+    name = ""
+    extensions: set[str] = set()
+
+    def available(self) -> bool:
+        return True
+
+    def supports(self, path_to_file: Path) -> bool:
+        return Path(path_to_file).suffix.lower() in self.extensions and self.available()
+
+    @contextmanager
+    def open(self, path_to_file: Path):
+        raise NotImplementedError
+
+    def sheet_names(self, workbook) -> list[str]:
+        raise NotImplementedError
+
+    def read_rows(self, workbook, sheet_name: str) -> Iterator[list]:
+        raise NotImplementedError
+
+
+class CalamineReader(WorkbookReader):
+    # Rust-библиотека calamine (python-calamine): самый быстрый вариант, читает и .ods
+    name = "calamine"
+    extensions = {".xlsx", ".xlsm", ".xls", ".ods"}
+
+    def available(self) -> bool:
+        return CalamineWorkbook is not None
+
+    @contextmanager
+    def open(self, path_to_file: Path):
+        workbook = CalamineWorkbook.from_path(str(path_to_file))
+        try:
+            yield workbook
+
+        finally:
+            if hasattr(workbook, "close"):
+                workbook.close()
+
+    def sheet_names(self, workbook) -> list[str]:
+        return workbook.sheet_names
+
+    def read_rows(self, workbook, sheet_name: str) -> Iterator[list]:
+        sheet = workbook.get_sheet_by_name(sheet_name)
+        # Строки начинаются с первой колонки с данными, слева добавляются пустые ячейки
+        padding = [None] * sheet.start[1] if sheet.start else []
+        for row in sheet.iter_rows():
+            yield padding + [convert_xlsx_value(value) for value in row]
+
+
+class OpenpyxlReader(WorkbookReader):
+    name = "openpyxl"
+    extensions = {".xlsx", ".xlsm"}
+
+    @contextmanager
+    def open(self, path_to_file: Path):
+        workbook = openpyxl.load_workbook(path_to_file, read_only=True, data_only=True, keep_links=False)
+        try:
+            yield workbook
+
+        finally:
+            workbook.close()
+
+    def sheet_names(self, workbook) -> list[str]:
+        return workbook.sheetnames
+
+    def read_rows(self, workbook, sheet_name: str) -> Iterator[list]:
+        worksheet = workbook[sheet_name]
+        # В режиме только чтения размеры листа могут быть не записаны в файл
+        if worksheet.max_row is None:
+            worksheet.reset_dimensions()
+        for row in worksheet.iter_rows(values_only=True):
+            yield [convert_xlsx_value(value) for value in row]
+
+
+class XlrdReader(WorkbookReader):
+    name = "xlrd"
+    extensions = {".xls"}
+
+    @contextmanager
+    def open(self, path_to_file: Path):
+        workbook = xlrd.open_workbook(path_to_file, on_demand=True)
+        try:
+            yield workbook
+
+        finally:
+            workbook.release_resources()
+
+    def sheet_names(self, workbook) -> list[str]:
+        return workbook.sheet_names()
+
+    def read_rows(self, workbook, sheet_name: str) -> Iterator[list]:
+        sheet = workbook.sheet_by_name(sheet_name)
+        try:
+            for row_idx in range(sheet.nrows):
+                yield [convert_xls_cell(cell, workbook.datemode) for cell in sheet.row(row_idx)]
+
+        finally:
+            workbook.unload_sheet(sheet_name)
+
+
+# Порядок автоматического выбора: сначала calamine, затем openpyxl/xlrd
+READERS = {reader.name: reader for reader in (CalamineReader(), OpenpyxlReader(), XlrdReader())}
+
+
+def select_readers(path_to_file: Path, engine: str | None = None) -> list[WorkbookReader]:
+    """
+    Движки для файла в порядке попыток: engine (по умолчанию settings.excel_reader_engine),
+    затем остальные подходящие по расширению как запасные. "auto" - порядок READERS.
+    """
+    engine = engine or settings.excel_reader_engine
+    if engine != "auto" and engine not in READERS:
+        raise ValueError(f"Неизвестный движок чтения Excel: {engine}")
+
+    readers = [reader for reader in READERS.values() if reader.supports(path_to_file)]
+    readers.sort(key=lambda reader: reader.name != engine)
+    return readers
+
+
+@contextmanager
+def open_workbook(path_to_file: Path, engine: str | None = None):
+    # Открывает книгу первым справившимся движком и отдаёт (движок, книга)
+    readers = select_readers(path_to_file, engine)
+    if not readers:
+        raise ValueError(f"Нет движка для чтения {Path(path_to_file).suffix} (для .ods нужен python-calamine)")
+
+    for i, reader in enumerate(readers):
+        opened = reader.open(path_to_file)
+        try:
+            workbook = opened.__enter__()
+
+        except Exception as e:
+            if i == len(readers) - 1:
+                raise
+            print(f"{reader.name} не открыл {Path(path_to_file).name}: {e}; пробуем {readers[i + 1].name}")
+            continue
+
+        try:
+            yield reader, workbook
+
+        finally:
+            opened.__exit__(None, None, None)
+        return
+
+
+def sheet_names(path_to_file: Path, engine: str | None = None) -> list[str]:
+    with open_workbook(path_to_file, engine) as (reader, workbook):
+        return reader.sheet_names(workbook)
+
+
+def trim_rows(rows, empty_rows_limit: int = EXCEL_EMPTY_ROWS_LIMIT) -> Iterator[list]:
+    """
+    Отбрасывает пустые ячейки в конце строк и пустые строки в конце листа.
+    Пустые строки между данными сохраняются (как у pd.read_excel), а после empty_rows_limit
+    пустых строк подряд чтение листа прекращается: дальше обычно только форматирование.
+    """
+    empty_rows = 0
+    for row in rows:
+        while row and row[-1] is None:
+            row.pop()
+
+        if not row:
+            empty_rows += 1
+            if empty_rows >= empty_rows_limit:
+                return
+            continue
+
+        for _ in range(empty_rows):
+            yield []
+        empty_rows = 0
+        yield row
+
+
+def iter_sheets(path_to_file: Path, names: list[str] | None = None,
+                engine: str | None = None) -> Iterator[tuple[str, Iterator[list]]]:
+    """
+    Листы книги по порядку: (имя листа, генератор строк).
+    Книга открывается один раз; строки листа нужно дочитать до перехода к следующему листу.
+    """
+    with open_workbook(path_to_file, engine) as (reader, workbook):
+        for name in names or reader.sheet_names(workbook):
+            yield name, trim_rows(reader.read_rows(workbook, name))
+
+
+def iter_frames(rows, chunk_rows: int = EXCEL_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Собирает строки листа в DataFrame по chunk_rows строк, в памяти одновременно только один кусок.
+    Ячейки хранятся как есть (dtype=object), пустые - NaN, колонки - 0, 1, 2... как при header=None.
+    Ширина - самая длинная строка из прочитанных: кусок не уже предыдущих, а если лист дальше
+    становится шире, следующий кусок расширяется, ячейки не обрезаются.
+    """
+    rows = iter(rows)
+    width = 1
+    while chunk := list(islice(rows, chunk_rows)):
+        width = max(width, max(len(row) for row in chunk))
+
+        data = [[np.nan if value is None else value for value in row] + [np.nan] * (width - len(row))
+                for row in chunk]
+        yield pd.DataFrame(data, columns=range(width), dtype=object)
+
+
+def find_name_column(df: pd.DataFrame, head_rows: int = 15):
+    # Первая колонка, в первых head_rows строках которой есть заголовок "наименование"
+    head = df.iloc[:head_rows]
+    found = [col for col in head.columns
+             if head[col].where(head[col].notna(), "").map(str).str.lower()
+             .str.contains("наименование", regex=False).any()]
+    return found[0] if found else None
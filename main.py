@@ -1,10 +1,11 @@
 from pathlib import Path
+import argparse
 import os
 
 from openpyxl import load_workbook
 
 import common.constants
-from common.constants import DIR_DATA_INPUT, PATH_DATA_INTERMEDIATE_XLSX_FILE
+from common.constants import DIR_DATA_INPUT, DIR_DATA_OUTPUT, PATH_DATA_INTERMEDIATE_XLSX_FILE
 from common.helpers import (
     convert_list_to_string_with_comma,
     resize_column_in_intermediate_xlsx,
@@ -12,9 +13,12 @@ from common.helpers import (
 )
 from parsers.pdf import ParserPDF
 from parsers.doc import DocParser
+from common.profiling import Profiler
 
 
-def activate_parsers(path_to_file: Path) -> None:
+def activate_parsers(path_to_file: Path,
+                     path_to_intermediate: Path | None = PATH_DATA_INTERMEDIATE_XLSX_FILE) -> dict[str, list[str]]:
+    # path_to_intermediate=None - результат только возвращается, промежуточный файл не пишется
     file_type = path_to_file.suffix
 
     if file_type == ".pdf":
@@ -29,8 +33,11 @@ def activate_parsers(path_to_file: Path) -> None:
         parser_data = {}
         print(f"\nНеизвестный формат файла: {file_type}\n")
 
-    print(f"\nСохранение результатов парса в промежуточный файл")
-    save_data_to_excel(parser_data, PATH_DATA_INTERMEDIATE_XLSX_FILE)
+    if path_to_intermediate is not None:
+        print("\nСохранение результатов парса в промежуточный файл")
+        save_data_to_excel(parser_data, path_to_intermediate)
+
+    return parser_data
 
 
 def save_data_to_excel(product_data: dict, path: Path) -> None:
@@ -64,8 +71,19 @@ def main(input_file_path: Path | None = None) -> None:
 
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Парсинг doc/docx/pdf в промежуточный файл")
+    arg_parser.add_argument("input_file", nargs="?", type=Path,
+                            default=Path(common.constants.CWD, 'uploads', 'ТЗ для Рос Волга-2025-02-19-11-19-07.doc'))
+    arg_parser.add_argument("--profile", action="store_true",
+                            help=f"снять профиль парсинга и сохранить его в {DIR_DATA_OUTPUT}")
+    args = arg_parser.parse_args()
+
     try:
-        main(Path(common.constants.CWD, 'uploads', 'ТЗ для Рос Волга-2025-02-19-11-19-07.doc'))
+        profiler = Profiler(args.profile)
+        with profiler.stage("parse"):
+            main(args.input_file)
+        for path in profiler.save(DIR_DATA_OUTPUT, args.input_file.stem):
+            print(f"Профиль сохранён: {path}")
 
     except KeyboardInterrupt:
         os.remove(PATH_DATA_INTERMEDIATE_XLSX_FILE)
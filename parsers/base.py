@@ -1,9 +1,10 @@
 from pathlib import Path
+from typing import Iterable
 
-import pandas as pd
-from fuzzywuzzy import fuzz
-import Levenshtein
-from common.constants import SYNONYMS, PRODUCT_NAMES
+from common.metrics import PARSE_SECONDS
+from common.segmentation import RowSegmenter, SegmentRules
+from common.tables import Table
+from parsers.matcher import MATCHER, PRODUCT_NAME_CUTOFF
 
 
 class BaseParser:
@@ -18,77 +19,71 @@ class BaseParser:
         instance = super().__new__(cls)
         instance.__init__(*args, **kwargs)
 
-        result: dict = instance.__parse()
+        with PARSE_SECONDS.time(parser=cls.__name__):
+            result: dict = instance.__parse()
 
         return result
 
-    def get_dataframes(self) -> list[pd.DataFrame]:
+    def get_tables(self) -> Iterable[Table]:
+        # Список или генератор таблиц; генератор разбирается по мере поступления таблиц
         pass
 
     @staticmethod
-    def __check_characteristic_partial_ratio(string: str, synonym: str) -> bool:
-        ratio = fuzz.partial_ratio(string.lower(), synonym.lower())
+    def check_characteristic(string: str) -> bool:
+        return MATCHER.is_characteristic(string)
 
-        if ratio >= 50:
-            return True
-
-        return False
-
-    def check_characteristic(self, string: str) -> bool:
-        is_characteristics: list[bool] = []
-
-        for name_synonym, synonyms in SYNONYMS.items():
-
-            if string is not None:
-                is_characteristic = self.__check_characteristic_partial_ratio(string, name_synonym)
-                is_characteristics.append(is_characteristic)
-
-                for synonym in synonyms:
-                    is_characteristic = self.__check_characteristic_partial_ratio(string, synonym)
-                    is_characteristics.append(is_characteristic)
+    @staticmethod
+    def check_product_name(string: str) -> tuple[bool, int]:
+        ratio = MATCHER.product_name_ratio(string)
+        return ratio >= PRODUCT_NAME_CUTOFF, ratio
 
-        if True in is_characteristics:
-            return True
+    def __parse(self) -> dict[str, list[str]]:
+        product_data = {}
+        segmenter = RowSegmenter(CellRules(self))
 
-        else:
-            return False
+        for table in self.get_tables():
+            print(table)
+            # Все ячейки таблицы сравниваются со словарями одним пакетом
+            MATCHER.classify(list(table.cells()))
 
-    @staticmethod
-    def check_product_name(string: str) -> tuple[bool, int]:
-        ratio = 0
+            for cell in table.cells():
+                for segment in segmenter.feed(cell):
+                    product_data[segment.name] = segment.lines
 
-        for name in PRODUCT_NAMES:
-            if string is not None:
-                ratio = fuzz.token_set_ratio(string.lower(), name.lower())
+            # Товар не переходит в следующую таблицу
+            for segment in segmenter.close():
+                product_data[segment.name] = segment.lines
 
-            if ratio == 100:
-                return True, ratio
+        return product_data
 
-        return False, ratio
 
-    def __parse(self) -> dict[str, list[str]]:
-        product_name: str | None = None
-        product_data = {}
-        dataframes = self.get_dataframes()
+class TableParser(BaseParser):
+    # Разбор уже прочитанных таблиц, без файла (выборка документа при оценке стратегий)
+    def __init__(self, tables: Iterable[Table]):
+        self.tables = tables
 
-        for dataframe in dataframes:
-            dataframe_values = dataframe.values
-            print(dataframe_values)
+    def get_tables(self) -> Iterable[Table]:
+        return self.tables
 
-            for value in dataframe_values:
-                for i in value:
-                    is_product_name, ratio = self.check_product_name(i)
 
-                    if is_product_name:
-                        print(f"\nname: {i}, ratio: {ratio}\n")
-                        product_name = i
-                        product_data[product_name] = []
-                        continue
+class CellRules(SegmentRules):
+    """
+    Ячейки таблиц подряд: ячейка с названием товара открывает товар,
+    ячейки-характеристики после неё входят в товар, остальные пропускаются.
+    """
+    include_start = False
 
-                    if self.check_characteristic(i) and product_name is not None:
-                        print(f"\ncharacteristic: {i}\n")
-                        product_data[product_name].append(i)
+    def __init__(self, parser: BaseParser):
+        self.parser = parser
 
-            product_name: str | None = None
+    def is_start(self, cell) -> bool:
+        is_product_name, ratio = self.parser.check_product_name(cell)
+        if is_product_name:
+            print(f"\nname: {cell}, ratio: {ratio}\n")
+        return is_product_name
 
-        return product_data
\ No newline at end of file
+    def accepts(self, cell) -> bool:
+        if self.parser.check_characteristic(cell):
+            print(f"\ncharacteristic: {cell}\n")
+            return True
+        return False
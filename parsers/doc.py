@@ -1,44 +1,39 @@
-import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
 
-from docx import Document
-import pandas as pd
-
-from common.helpers import convert_doc_to_docx
+from common.conversion import get_conversion_service
+from common.docx_reader import BLOCK_TABLE, Block, iter_blocks
+from common.tables import Table
 from .base import BaseParser
 
 
+def document_tables(blocks: Iterable[Block]) -> Iterator[Table]:
+    # 🔹 Только таблицы документа: абзацы свободного текста разбирают стратегии (uniqe_doc)
+    for block in blocks:
+        if block.kind == BLOCK_TABLE:
+            # 🔹 Убираем пробелы и символы новой строки
+            yield Table((cell.strip() for cell in row) for row in block.rows)
+
+
 class DocParser(BaseParser):
     def __check_is_doc_file(self) -> bool:
-        if self.path_to_file.suffix == ".doc":
+        if self.path_to_file.suffix.lower() == ".doc":
             return True
 
-        elif self.path_to_file.suffix == ".docx":
+        elif self.path_to_file.suffix.lower() == ".docx":
             return False
 
         else:
             raise TypeError(f"Unsupported file type: {self.path_to_file}")
 
-    def get_dataframes(self) -> list[pd.DataFrame]:
-        dataframes = []
-
+    def get_tables(self) -> Iterator[Table]:
         is_doc_file = self.__check_is_doc_file()
 
-        if is_doc_file:
-            self.path_to_file = convert_doc_to_docx(self.path_to_file)
-
-        # 🔹 Открываем Word-файл
-        doc = Document(str(self.path_to_file))
-
-        for table in doc.tables:
-            # 🔹 Извлекаем данные в список списков
-            data = []
-            for row in table.rows:
-                data.append([cell.text.strip() for cell in row.cells])  # Убираем пробелы и символы новой строки
-
-            # 🔹 Преобразуем в DataFrame
-            dataframes.append(pd.DataFrame(data))
-
-        if is_doc_file:
-            os.remove(self.path_to_file)
+        # 🔹 .doc конвертируется пулом конвертеров (с кешем) во временный каталог, который удаляется вместе с .docx
+        with tempfile.TemporaryDirectory(prefix="doc-") as tmp_dir:
+            path_to_docx = (get_conversion_service().convert(self.path_to_file, Path(tmp_dir)) if is_doc_file
+                            else self.path_to_file)
 
-        return dataframes
\ No newline at end of file
+            # 🔹 Таблицы читаются потоково из document.xml, объединённые ячейки уже развёрнуты
+            yield from document_tables(iter_blocks(path_to_docx))
@@ -1,80 +1,48 @@
-import pandas as pd
 from pathlib import Path
-import importlib.util
+import sys
 
+# При запуске скриптом из своего каталога корень проекта добавляется в sys.path
 BASE_DIR = Path(__file__).resolve().parents[2]
-SETTINGS_PATH = BASE_DIR / "settings.py"
-
-spec = importlib.util.spec_from_file_location("settings", SETTINGS_PATH)
-settings = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(settings)
-
-
-class StructuredXlsxParser:
-    PRODUCT_NAMES = settings.product_names
-
-    def __init__(self, file_path):
-        self.file_path = Path(file_path)
-        self.data = []
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-    def parse_xlsx(self):
-        print(f"Opening file: {self.file_path}")
-        df = pd.read_excel(self.file_path, header=None, engine='openpyxl')  # Загружаем весь файл
-
-        # Найти столбец, содержащий "Наименование"
-        name_column = None
-        for col in df.columns:
-            for row_idx in range(min(15, len(df))):  # Проверяем первые 10 строк
-                cell_value = str(df.iloc[row_idx, col]).lower() if pd.notna(df.iloc[row_idx, col]) else ""
-                if "наименование" in cell_value:
-                    name_column = col
-                    print(f"Found 'Наименование' column at index {col}")  # Отладочный вывод
-                    break
-            if name_column is not None:
-                break
+import pandas as pd
 
-        if name_column is None:
-            print("Column 'Наименование' not found!")
-            return
+from common.keywords import KEYWORDS
+from common.segmentation import SegmentRules, segment_rows
+from common.workbooks import find_name_column
+from parsers.strategy import ExcelStrategy, print_products, register
 
-        current_product = None
-        product_data = {}
 
-        # Перебираем строки в найденном столбце
-        for index, row in df.iterrows():
-            if pd.isna(row[name_column]):
-                continue
+class NameColumnRules(SegmentRules):
+    # Строка с названием товара в колонке наименования открывает товар, следующие строки - его поля
+    def __init__(self, name_column: int):
+        self.name_column = name_column
 
-            cell_value = str(row[name_column]).strip()
+    def line(self, row):
+        return None if pd.isna(row[self.name_column]) else str(row[self.name_column]).strip()
 
-            if any(name.lower() in cell_value.lower() for name in self.PRODUCT_NAMES):
-                if current_product:
-                    self.data.append(product_data)
-                current_product = cell_value
-                product_data = {"0": current_product}
-            elif current_product:
-                product_data[f"{len(product_data)}"] = cell_value
+    def is_start(self, text) -> bool:
+        return KEYWORDS.contains_product_name(text)
 
-        if current_product:
-            self.data.append(product_data)
 
-    def print_data(self):
-        if not self.data:
-            print("No data parsed!")
-        for product in self.data:
-            print(product)
+@register
+class Tz213054Strategy(ExcelStrategy):
+    """
+    ТЗ для 213054: колонка "Наименование" в первых 15 строках листа, наименование и поля товара
+    идут в ней построчно. Запись товара: {"0": наименование, "1": поле, ...}.
+    """
+    name = "tz_213054"
 
-    def process(self):
-        if not self.file_path.exists():
-            print(f"File not found: {self.file_path}")
-            return
+    def parse(self, df):
+        name_column = find_name_column(df)
+        if name_column is None:
+            return []
 
-        print(f"Processing file: {self.file_path.name}")
-        self.parse_xlsx()
-        self.print_data()
+        rows = df.itertuples(index=False, name=None)
+        return [{f"{index}": line for index, line in enumerate(product.lines)}
+                for product in segment_rows(rows, NameColumnRules(name_column))]
 
 
-# Использование
-file_path = Path("..", "..", "test_data", "input", "ТЗ для 213054.xlsx")  # Конкретный файл XLSX
-parser = StructuredXlsxParser(file_path)
-parser.process()
+if __name__ == "__main__":
+    print_products(Tz213054Strategy(), Path("..", "..", "test_data", "input", "ТЗ для 213054.xlsx"))
@@ -1,64 +1,39 @@
-import pandas as pd
 from pathlib import Path
-import importlib.util
+import sys
 
+# При запуске скриптом из своего каталога корень проекта добавляется в sys.path
 BASE_DIR = Path(__file__).resolve().parents[2]
-SETTINGS_PATH = BASE_DIR / "settings.py"
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-spec = importlib.util.spec_from_file_location("settings", SETTINGS_PATH)
-settings = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(settings)
+from common.keywords import KEYWORDS
+from common.segmentation import SegmentRules, segment_rows
+from parsers.strategy import ExcelStrategy, print_products, register
 
 
-class StructuredXlsxParser:
-    PRODUCT_NAMES = settings.product_names
+class FirstColumnRules(SegmentRules):
+    # Строка, начинающаяся с названия товара, открывает товар, следующие строки - его поля
+    def line(self, value):
+        return str(value).strip()
 
-    def __init__(self, file_path):
-        self.file_path = Path(file_path)
-        self.data = []
+    def is_start(self, text) -> bool:
+        return KEYWORDS.starts_with_product_name(text)
 
-    def is_product_name(self, text):
-        """ Проверяет, является ли строка названием нового товара """
-        return any(text.lower().startswith(name.lower()) for name in self.PRODUCT_NAMES)
 
-    def parse_excel(self):
-        print(f"Opening file: {self.file_path}")  # Отладочный вывод
-        df = pd.read_excel(self.file_path, header=None, usecols=[0], engine='openpyxl')  # Читаем только 1-й столбец
+@register
+class GptStrategy(ExcelStrategy):
+    """
+    ТЗ для GPT: товары в первой колонке листа, наименование и характеристики построчно.
+    Запись товара: {"0": наименование, "1": поле, "2": поле, ...}.
+    """
+    name = "tz_gpt"
 
-        current_product = None
-        product_data = {}
+    def parse(self, df):
+        if df.empty:
+            return []
+        return [{f"{index}": line for index, line in enumerate(product.lines)}
+                for product in segment_rows(df[0], FirstColumnRules())]
 
-        for index, row in df.iterrows():
-            cell_value = str(row[0]).strip()
 
-            if self.is_product_name(cell_value):
-                if current_product:
-                    self.data.append(product_data)
-                current_product = cell_value
-                product_data = {"0": current_product}
-            else:
-                product_data[f"{len(product_data)}"] = cell_value
-
-        if current_product:
-            self.data.append(product_data)
-
-    def print_data(self):
-        if not self.data:
-            print("No data parsed!")
-        for product in self.data:
-            print(product)
-
-    def process(self):
-        if not self.file_path.exists():
-            print(f"File not found: {self.file_path}")
-            return
-
-        print(f"Processing file: {self.file_path.name}")
-        self.parse_excel()
-        self.print_data()
-
-
-# Использование
-file_path = Path("..", "..", "test_data", "input", "ТЗ для GPT.xlsx")  # Конкретный файл Excel
-parser = StructuredXlsxParser(file_path)
-parser.process()
+if __name__ == "__main__":
+    print_products(GptStrategy(), Path("..", "..", "test_data", "input", "ТЗ для GPT.xlsx"))
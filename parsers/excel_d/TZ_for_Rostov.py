@@ -1,82 +1,62 @@
-import pandas as pd
 from pathlib import Path
-import importlib.util
+import sys
 
+# При запуске скриптом из своего каталога корень проекта добавляется в sys.path
 BASE_DIR = Path(__file__).resolve().parents[2]
-SETTINGS_PATH = BASE_DIR / "settings.py"
-
-spec = importlib.util.spec_from_file_location("settings", SETTINGS_PATH)
-settings = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(settings)
-
-
-class StructuredXlsParser:
-    PRODUCT_NAMES = settings.product_names
-
-    def __init__(self, file_path):
-        self.file_path = Path(file_path)
-        self.data = []
-
-    def parse_xls(self):
-        print(f"Opening file: {self.file_path}")
-        df = pd.read_excel(self.file_path, header=None, engine='xlrd')  # Загружаем файл XLS
-
-        # Найти столбец с "Наименование"
-        name_column = None
-        characteristics_column = None
-        for col in df.columns:
-            for row_idx in range(min(15, len(df))):  # Проверяем первые 15 строк
-                cell_value = str(df.iloc[row_idx, col]).lower() if pd.notna(df.iloc[row_idx, col]) else ""
-                if "наименование" in cell_value:
-                    name_column = col
-                    characteristics_column = col + 1  # Предполагаем, что характеристики справа
-                    print(f"Found 'Наименование' column at index {col}")
-                    break
-            if name_column is not None:
-                break
-
-        if name_column is None or characteristics_column is None:
-            print("Column 'Наименование' or characteristics column not found!")
-            return
-
-        current_product = None
-        product_data = {}
-
-        # Перебираем строки в найденном столбце
-        for index, row in df.iterrows():
-            if pd.isna(row[name_column]):
-                continue
-
-            cell_value = str(row[name_column]).strip().replace("\t", " ")
-            char_value = str(row[name_column + 1]).strip().replace("\t", " ").replace("\n", ";")
-
-            if any(name.lower() in cell_value.lower() for name in self.PRODUCT_NAMES):
-                if current_product:
-                    self.data.append(product_data)
-                current_product = cell_value
-                current_property = char_value
-                product_data = {"0": current_product, "1": current_property}
-
-        if current_product:
-            self.data.append(product_data)
-
-    def print_data(self):
-        if not self.data:
-            print("No data parsed!")
-        for product in self.data:
-            print(product)
-
-    def process(self):
-        if not self.file_path.exists():
-            print(f"File not found: {self.file_path}")
-            return
-
-        print(f"Processing file: {self.file_path.name}")
-        self.parse_xls()
-        self.print_data()
-
-
-# Использование
-file_path = Path("..", "..", "test_data", "input", "ТЗ для Ростов.xls")  # Конкретный файл XLS
-parser = StructuredXlsParser(file_path)
-parser.process()
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd
+
+from common.keywords import KEYWORDS
+from common.segmentation import SegmentRules, segment_rows
+from common.workbooks import find_name_column
+from parsers.strategy import ExcelStrategy, print_products, register
+
+
+def clean_cell(value) -> str:
+    return str(value).strip().replace("\t", " ")
+
+
+class ProductRowRules(SegmentRules):
+    # Товар - только строка с названием в колонке наименования, остальные строки пропускаются
+    def __init__(self, name_column: int):
+        self.name_column = name_column
+
+    def line(self, row):
+        return None if pd.isna(row[self.name_column]) else row
+
+    def is_start(self, row) -> bool:
+        return KEYWORDS.contains_product_name(clean_cell(row[self.name_column]))
+
+    def name(self, row) -> str:
+        return clean_cell(row[self.name_column])
+
+    def accepts(self, row) -> bool:
+        return False
+
+
+@register
+class RostovStrategy(ExcelStrategy):
+    """
+    ТЗ для Ростов (и Татэн): колонка "Наименование" в первых 15 строках листа
+    и характеристики в char_columns колонках справа от неё.
+    Запись товара: {"0": наименование, "1": характеристики}.
+    """
+    name = "tz_rostov"
+    char_columns = 1
+
+    def parse(self, df):
+        name_column = find_name_column(df)
+        if name_column is None or name_column + self.char_columns >= df.shape[1]:
+            return []
+
+        columns = range(name_column + 1, name_column + 1 + self.char_columns)
+        rows = df.itertuples(index=False, name=None)
+        return [{"0": product.name,
+                 "1": " ".join(clean_cell(product.lines[0][column]).replace("\n", ";") for column in columns)}
+                for product in segment_rows(rows, ProductRowRules(name_column))]
+
+
+if __name__ == "__main__":
+    print_products(RostovStrategy(), Path("..", "..", "test_data", "input", "ТЗ для Ростов.xls"))
@@ -0,0 +1,4 @@
+# Модули регистрируют свои стратегии в parsers.strategy при импорте
+from . import TZ_for_213054, TZ_for_GPT, TZ_for_Ros_Tum, TZ_for_Rostov, TZ_for_Taten, uniqe_xls
+
+__all__ = ["TZ_for_213054", "TZ_for_GPT", "TZ_for_Ros_Tum", "TZ_for_Rostov", "TZ_for_Taten", "uniqe_xls"]
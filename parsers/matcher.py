@@ -0,0 +1,93 @@
+import threading
+
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+from common.constants import SYNONYMS, PRODUCT_NAMES
+
+CHARACTERISTIC_CUTOFF = 50
+PRODUCT_NAME_CUTOFF = 100
+MEMO_MAX_SIZE = 100_000
+
+
+class FuzzyMatcher:
+    """
+    Нечёткий поиск характеристик и названий товаров в ячейках таблиц.
+    Варианты (ключи и синонимы SYNONYMS, PRODUCT_NAMES) нормализуются один раз при создании,
+    ячейки таблицы сравниваются со всеми вариантами одним вызовом process.cdist с отсечкой,
+    а результаты для повторяющихся строк запоминаются.
+    Один MATCHER общий для потоков (пакетная загрузка, LocalJobQueue): запись в memo под lock,
+    чтение - одним get, ответ - всегда только что посчитанное или прочитанное значение.
+    """
+
+    def __init__(self, synonyms: dict[str, list[str]] = SYNONYMS, product_names: list[str] = PRODUCT_NAMES):
+        characteristics = [variant for key, variants in synonyms.items() for variant in (key, *variants)]
+        # dict.fromkeys убирает дубликаты с сохранением порядка
+        self.characteristic_choices = list(dict.fromkeys(variant.lower() for variant in characteristics))
+        self.product_choices = list(dict.fromkeys(default_process(name) for name in product_names))
+        self.characteristic_memo: dict[str, bool] = {}
+        self.product_memo: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def remember(self, memo: dict, key: str, value) -> None:
+        with self.lock:
+            if len(memo) >= MEMO_MAX_SIZE:
+                memo.clear()
+            memo[key] = value
+
+    def is_characteristic(self, string: str | None) -> bool:
+        # Аналог fuzz.partial_ratio >= 50 хотя бы с одним ключом или синонимом
+        if string is None:
+            return False
+
+        value = self.characteristic_memo.get(string)
+        if value is None:
+            match = process.extractOne(string.lower(), self.characteristic_choices, scorer=fuzz.partial_ratio,
+                                       score_cutoff=CHARACTERISTIC_CUTOFF)
+            value = match is not None
+            self.remember(self.characteristic_memo, string, value)
+
+        return value
+
+    def product_name_ratio(self, string: str | None) -> int:
+        # Лучший token_set_ratio с названиями товаров (100 - все слова названия есть в строке)
+        if string is None:
+            return 0
+
+        value = self.product_memo.get(string)
+        if value is None:
+            match = process.extractOne(default_process(string), self.product_choices, scorer=fuzz.token_set_ratio,
+                                       processor=None)
+            value = round(match[1]) if match else 0
+            self.remember(self.product_memo, string, value)
+
+        return value
+
+    def is_product_name(self, string: str | None) -> bool:
+        return self.product_name_ratio(string) >= PRODUCT_NAME_CUTOFF
+
+    def classify(self, strings: list) -> None:
+        """
+        Пакетно считает признаки для всех новых строк таблицы и кладёт их в memo,
+        после чего is_characteristic/is_product_name для этих строк отвечают из памяти
+        (если memo не очистили между вызовами, иначе признак просто посчитается заново).
+        """
+        new_strings = list(dict.fromkeys(
+            string for string in strings
+            if isinstance(string, str) and (string not in self.characteristic_memo or string not in self.product_memo)
+        ))
+        if not new_strings:
+            return
+
+        product_scores = process.cdist([default_process(string) for string in new_strings], self.product_choices,
+                                       scorer=fuzz.token_set_ratio, workers=-1)
+        characteristic_scores = process.cdist([string.lower() for string in new_strings],
+                                              self.characteristic_choices, scorer=fuzz.partial_ratio,
+                                              score_cutoff=CHARACTERISTIC_CUTOFF, workers=-1)
+
+        for string, product_row, characteristic_row in zip(new_strings, product_scores, characteristic_scores):
+            self.remember(self.product_memo, string, round(float(product_row.max())) if len(product_row) else 0)
+            self.remember(self.characteristic_memo, string, bool((characteristic_row >= CHARACTERISTIC_CUTOFF).any()))
+
+
+MATCHER = FuzzyMatcher()
@@ -1,18 +1,22 @@
-import pdfplumber
-import pandas as pd
+from typing import Iterable, Iterator
 
+from common.pdf_pages import PAGE_TABLE, PageTables, iter_page_tables
+from common.tables import Table
 from .base import BaseParser
 
 
-class ParserPDF(BaseParser):
-    def get_dataframes(self) -> list[pd.DataFrame]:
-        with pdfplumber.open(self.path_to_file) as file_pdf:
-            dataframes = []
-
-            for page in file_pdf.pages:
-                table = page.extract_table()
+def page_tables(pages: Iterable[PageTables]) -> Iterator[Table]:
+    # Таблицы отдаются по одной, чтобы сегментация шла, не дожидаясь конца документа
+    for page in pages:
+        for table in page.tables:
+            if page.decision == PAGE_TABLE:
+                yield Table(table[1:], header=table[0], page=page.page_number)
+            else:
+                # У распознанного скана нет шапки, первая строка - уже данные
+                yield Table(table, page=page.page_number)
 
-                if table is not None:
-                    dataframes.append(pd.DataFrame(table[1:], columns=table[0]))
 
-        return dataframes
\ No newline at end of file
+class ParserPDF(BaseParser):
+    def get_tables(self) -> Iterator[Table]:
+        # Страницы разбираются параллельно (common.pdf_pages) и приходят в порядке страниц
+        return page_tables(iter_page_tables(self.path_to_file, all_tables=False))
@@ -1,24 +1,27 @@
-import pdfplumber
 import re
 from pathlib import Path
-import importlib.util
+import sys
 import collections
 
+# При запуске скриптом из своего каталога корень проекта добавляется в sys.path
 BASE_DIR = Path(__file__).resolve().parents[2]
-SETTINGS_PATH = BASE_DIR / "settings.py"
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-spec = importlib.util.spec_from_file_location("settings", SETTINGS_PATH)
-settings = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(settings)
+from common.keywords import KEYWORDS
+from common.segmentation import SegmentRules, segment_rows
+from parsers.strategy import PdfStrategy, print_products, register
 
 
-class StructuredPdfParser:
-    PRODUCT_NAMES = settings.product_names
+class HeaderRules(SegmentRules):
+    """
+    Строка с наименованием товара открывает запись; по первым таким строкам определяется маска
+    заголовков (например "12."), и дальше запись открывает и строка, подходящая под маску.
+    Остальные строки - продолжение записи, строки с единицами количества пропускаются.
+    """
     EXCLUDE_WORDS = ["шт.", "шт", "штук"]
 
-    def __init__(self, file_path):
-        self.file_path = Path(file_path)
-        self.data = []
+    def __init__(self):
         self.header_candidates = []  # список токенов из первых пяти найденных заголовков товара
         self.header_mask = None      # регулярное выражение для определения начала нового товара
 
@@ -52,84 +55,57 @@ class StructuredPdfParser:
         if len(self.header_candidates) >= 5 and not self.header_mask:
             self.header_mask = self.determine_common_pattern()
 
-    def is_new_header(self, row_combined):
-        """
-        Если паттерн определён, строка считается началом нового товара, если совпадает с паттерном.
-        Если паттерн не установлен, в качестве критерия используется наличие наименования товара.
-        """
-        if self.header_mask:
-            return bool(self.header_mask.match(row_combined))
-        return any(name.lower() in row_combined.lower() for name in self.PRODUCT_NAMES)
-
-    def parse_pdf(self):
-        print(f"Opening file: {self.file_path}")
-        current_record = None
-        with pdfplumber.open(self.file_path) as pdf:
-            for page_number, page in enumerate(pdf.pages, start=1):
-                tables = page.extract_tables()
-                if not tables:
-                    continue
-
-                for table_idx, table in enumerate(tables):
-                    print(f"Processing table {table_idx + 1} on page {page_number}")
-                    for row in table:
-                        row_text = [str(cell).strip().replace("\n", " ") for cell in row if cell]
-                        if not row_text:
-                            continue
-                        row_combined = " | ".join(row_text)
-                        row_lower = row_combined.lower()
-
-                        # Пропускаем строки, содержащие исключающие слова
-                        if any(ex_word in row_lower for ex_word in self.EXCLUDE_WORDS):
-                            continue
-
-                        # Если строка содержит наименование товара, считаем её кандидатом на начало записи
-                        if any(name.lower() in row_lower for name in self.PRODUCT_NAMES):
-                            tokens = row_combined.split()
-                            first_token = tokens[0] if tokens else ""
-                            if first_token and first_token not in self.header_candidates:
-                                self.header_candidates.append(first_token)
-                            # Обновляем маску, если набрано достаточно кандидатов
-                            self.update_header_mask()
-
-                            # Если уже есть накопленная запись, сохраняем её
-                            if current_record:
-                                self.data.append({"0": current_record})
-                            current_record = row_combined
-                        else:
-                            # Если паттерн установлен и строка соответствует началу нового товара,
-                            # то считаем её новым заголовком
-                            if self.header_mask and self.is_new_header(row_combined):
-                                if current_record:
-                                    self.data.append({"0": current_record})
-                                current_record = row_combined
-                            else:
-                                # Иначе, строка считается продолжением предыдущего товара
-                                if current_record:
-                                    if current_record.endswith('-'):
-                                        current_record = current_record.rstrip('-') + row_combined.lstrip()
-                                    else:
-                                        current_record += " " + row_combined
-        if current_record:
-            self.data.append({"0": current_record})
-
-    def print_data(self):
-        if not self.data:
-            print("No data parsed!")
+    def line(self, row):
+        row_text = [str(cell).strip().replace("\n", " ") for cell in row if cell]
+        if not row_text:
+            return None
+        row_combined = " | ".join(row_text)
+        row_lower = row_combined.lower()
+
+        # Пропускаем строки, содержащие исключающие слова
+        if any(ex_word in row_lower for ex_word in self.EXCLUDE_WORDS):
+            return None
+        return row_combined
+
+    def is_start(self, row_combined) -> bool:
+        # Строка с наименованием товара или, если паттерн установлен, строка, совпадающая с ним
+        if KEYWORDS.contains_product_name(row_combined):
+            return True
+        return bool(self.header_mask and self.header_mask.match(row_combined))
+
+    def on_start(self, row_combined) -> None:
+        # Строка с наименованием товара - кандидат для маски заголовков
+        if KEYWORDS.contains_product_name(row_combined):
+            tokens = row_combined.split()
+            first_token = tokens[0] if tokens else ""
+            if first_token and first_token not in self.header_candidates:
+                self.header_candidates.append(first_token)
+            # Обновляем маску, если набрано достаточно кандидатов
+            self.update_header_mask()
+
+
+def join_record(lines: list[str]) -> str:
+    # Строки записи через пробел; перенос со знаком "-" в конце строки склеивается без пробела
+    record = lines[0]
+    for row_combined in lines[1:]:
+        if record.endswith('-'):
+            record = record.rstrip('-') + row_combined.lstrip()
         else:
-            for product in self.data:
-                print(product)
+            record += " " + row_combined
+    return record
+
 
-    def process(self):
-        if not self.file_path.exists():
-            print(f"File not found: {self.file_path}")
-            return
+@register
+class NiiarStrategy(PdfStrategy):
+    # ТЗ для НИИАР: записи товаров в таблицах PDF переходят со строки на строку и со страницы на страницу
+    name = "tz_niiar"
 
-        print(f"Processing file: {self.file_path.name}")
-        self.parse_pdf()
-        self.print_data()
+    def parse(self, pages):
+        # Таблицы страниц приходят по порядку страниц, поэтому запись, маска заголовков
+        # и переносы "-" переходят через границы таблиц и страниц
+        rows = (row for table in self.tables(pages) for row in table)
+        return [{"0": join_record(product.lines)} for product in segment_rows(rows, HeaderRules())]
 
 
-file_path = Path("..", "..", "test_data", "input", "ТЗ для НИИАР поз №158.pdf")
-parser = StructuredPdfParser(file_path)
-parser.process()
+if __name__ == "__main__":
+    print_products(NiiarStrategy(), Path("..", "..", "test_data", "input", "ТЗ для НИИАР поз №158.pdf"))
@@ -0,0 +1,4 @@
+# Модули регистрируют свои стратегии в parsers.strategy при импорте
+from . import TZ_for_NIIAR, TZ_for_RIR
+
+__all__ = ["TZ_for_NIIAR", "TZ_for_RIR"]
@@ -0,0 +1,277 @@
+import importlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice, repeat
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+import settings
+from common.constants import STRATEGY_SAMPLE_PAGES, STRATEGY_SAMPLE_ROWS, STRATEGY_SAMPLE_TABLES
+from common.conversion import get_conversion_service
+from common.docx_reader import BLOCK_TABLE, iter_blocks
+from common.keywords import CHARACTERISTIC, KEYWORDS
+from common.metrics import PARSER_STRATEGY, STRATEGY_SELECTION_SECONDS, merge_metrics, run_with_metrics
+from common.pdf_pages import iter_page_tables
+from common.workbooks import iter_frames, iter_sheets
+
+EXCEL_EXTENSIONS = (".xlsx", ".xls", ".xlsm", ".ods")
+WORD_EXTENSIONS = (".docx", ".doc")
+PDF_EXTENSIONS = (".pdf",)
+
+# Пакеты стратегий под отдельные ТЗ; общие стратегии регистрирует pipeline
+STRATEGY_PACKAGES = ("parsers.excel_d", "parsers.word_d", "parsers.pdf_d")
+
+# Реестр стратегий по имени, заполняется декоратором register при импорте модулей стратегий
+STRATEGIES: dict[str, type["ParserStrategy"]] = {}
+
+
+def register(cls: type["ParserStrategy"]) -> type["ParserStrategy"]:
+    STRATEGIES[cls.name] = cls
+    return cls
+
+
+@lru_cache(maxsize=None)
+def load_strategies() -> None:
+    for package in STRATEGY_PACKAGES:
+        importlib.import_module(package)
+
+
+def product_text(record) -> str:
+    # Запись стратегии (словарь полей, список ячеек или строка) - одна строка товара для модели
+    if isinstance(record, dict):
+        record = record.values()
+    elif not isinstance(record, (list, tuple)):
+        return str(record)
+    return " ".join(text for text in map(product_text, record) if text)
+
+
+class ParserStrategy:
+    """
+    Стратегия парсинга: как из файла одного формата получить товары.
+    read() читает файл (limit - только начало, выборка для оценки), parse() разбирает прочитанное
+    в записи товаров. Чтение общее для стратегий одного формата (sample_key), поэтому выборка
+    читается один раз и отдаётся всем стратегиям этого формата.
+    """
+    name = ""
+    extensions: tuple[str, ...] = ()
+    sample_size: int | None = None
+    # При равной оценке выбирается стратегия с большим приоритетом (общие парсеры)
+    priority = 0
+
+    def applies(self, path_to_file: Path) -> bool:
+        return path_to_file.suffix.lower() in self.extensions
+
+    def sample_key(self) -> tuple:
+        return (type(self).read,)
+
+    def read(self, path_to_file: Path, limit: int | None = None):
+        raise NotImplementedError
+
+    def read_sample(self, path_to_file: Path):
+        return self.read(path_to_file, self.sample_size)
+
+    def parse(self, source) -> list:
+        raise NotImplementedError
+
+    @staticmethod
+    def texts(records: Iterable) -> list[str]:
+        return [text for text in map(product_text, records) if text.strip()]
+
+    def products(self, source) -> list[str]:
+        return self.texts(self.parse(source))
+
+    def parse_file(self, path_to_file: Path) -> list[str]:
+        return self.products(self.read(path_to_file))
+
+
+class ExcelStrategy(ParserStrategy):
+    # Первый лист книги одним DataFrame без заголовка, как pd.read_excel(header=None)
+    extensions = EXCEL_EXTENSIONS
+    sample_size = STRATEGY_SAMPLE_ROWS
+
+    def read(self, path_to_file: Path, limit: int | None = None) -> pd.DataFrame:
+        for _, rows in iter_sheets(path_to_file):
+            frames = list(iter_frames(islice(rows, limit)))
+            if frames:
+                return pd.concat(frames, ignore_index=True)
+            break
+        return pd.DataFrame()
+
+
+class WordStrategy(ParserStrategy):
+    # Абзацы и таблицы .docx в порядке документа (.doc конвертируется заранее, см. document_path)
+    extensions = WORD_EXTENSIONS
+    sample_size = STRATEGY_SAMPLE_TABLES
+
+    def read(self, path_to_file: Path, limit: int | None = None) -> Iterable:
+        blocks = iter_blocks(path_to_file, max_tables=limit)
+        return list(blocks) if limit is not None else blocks
+
+    @staticmethod
+    def tables(blocks: Iterable) -> Iterator[list[list[str]]]:
+        for block in blocks:
+            if block.kind == BLOCK_TABLE:
+                yield block.rows
+
+
+class PdfStrategy(ParserStrategy):
+    # Таблицы PDF по страницам; all_tables=False - только самая крупная таблица страницы
+    extensions = PDF_EXTENSIONS
+    sample_size = STRATEGY_SAMPLE_PAGES
+    all_tables = True
+
+    def sample_key(self) -> tuple:
+        return (type(self).read, self.all_tables)
+
+    def read(self, path_to_file: Path, limit: int | None = None) -> Iterable:
+        pages = iter_page_tables(path_to_file, all_tables=self.all_tables, max_pages=limit)
+        return list(pages) if limit is not None else pages
+
+    @staticmethod
+    def tables(pages: Iterable) -> Iterator[list[list]]:
+        for page in pages:
+            yield from page.tables
+
+
+def score_products(texts: list[str]) -> int:
+    """
+    Оценка результата стратегии: товар без наименования не считается, товар с наименованием
+    даёт 1 и ещё по 1 за каждую найденную в нём характеристику (без повторов).
+    Склеить весь документ в один товар или разрезать товар по строкам выходит дешевле,
+    чем найти каждый товар целиком.
+    """
+    score = 0
+    for text in texts:
+        if KEYWORDS.contains_product_name(text):
+            score += 1 + len({hit.value for hit in KEYWORDS.iter_hits(text, CHARACTERISTIC)})
+    return score
+
+
+def score_sample(strategy: ParserStrategy, sample) -> int:
+    # Выполняется в процессе оценки: стратегия, упавшая на выборке, просто проигрывает
+    try:
+        return score_products(strategy.products(sample))
+
+    except Exception as e:
+        print(f"Стратегия {strategy.name} не разобрала выборку: {e!r}")
+        return -1
+
+
+def applicable_strategies(path_to_file: Path) -> list[ParserStrategy]:
+    load_strategies()
+    strategies = [cls() for cls in STRATEGIES.values()]
+    strategies = [strategy for strategy in strategies if strategy.applies(path_to_file)]
+    if settings.parser_strategy != "auto":
+        forced = [strategy for strategy in strategies if strategy.name == settings.parser_strategy]
+        if forced:
+            return forced
+        print(f"Стратегия {settings.parser_strategy} не подходит для {path_to_file.name}, выбирается по выборке")
+    return strategies
+
+
+def resolve_workers(workers: int | None = None) -> int:
+    workers = settings.strategy_workers if workers is None else workers
+    return workers or os.cpu_count() or 1
+
+
+@lru_cache(maxsize=1)
+def get_scoring_executor(workers: int) -> ProcessPoolExecutor:
+    # Один пул оценки на процесс, создаётся при первой оценке и живёт до конца процесса
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def score_samples(strategies: list[ParserStrategy], sources: list, workers: int) -> list[int]:
+    # Выборка маленькая (миллисекунды работы), поэтому по умолчанию оценка идёт в текущем процессе
+    if workers <= 1:
+        return list(map(score_sample, strategies, sources))
+
+    try:
+        scores = []
+        for score, values in get_scoring_executor(workers).map(run_with_metrics, repeat(score_sample),
+                                                               strategies, sources):
+            merge_metrics(values)
+            scores.append(score)
+        return scores
+
+    except BrokenProcessPool as e:
+        print(f"Пул оценки стратегий сломан ({e}), оцениваем в текущем процессе")
+        get_scoring_executor(workers).shutdown(wait=False, cancel_futures=True)
+        get_scoring_executor.cache_clear()
+        return list(map(score_sample, strategies, sources))
+
+
+def select_strategy(path_to_file: Path, strategies: list[ParserStrategy],
+                    workers: int | None = None) -> ParserStrategy:
+    """
+    Лучшая стратегия для файла: все подходящие стратегии разбирают выборку документа
+    (первые строки, таблицы или страницы, см. sample_size) - в текущем процессе или,
+    если settings.strategy_workers > 1, в общем постоянном пуле процессов.
+    Результат оценивается score_products, и на всём файле потом запускается только победитель.
+    Выборка читается один раз на каждый способ чтения (sample_key), а не на каждую стратегию.
+    """
+    if len(strategies) == 1:
+        return strategies[0]
+
+    with STRATEGY_SELECTION_SECONDS.time():
+        samples = {}
+        for strategy in strategies:
+            key = strategy.sample_key()
+            if key not in samples:
+                samples[key] = strategy.read_sample(path_to_file)
+        sources = [samples[strategy.sample_key()] for strategy in strategies]
+
+        scores = score_samples(strategies, sources, resolve_workers(workers))
+
+    for strategy, score in zip(strategies, scores):
+        print(f"{path_to_file.name}: стратегия {strategy.name}, оценка выборки {score}")
+    return max(zip(strategies, scores), key=lambda item: (item[1], item[0].priority))[0]
+
+
+@contextmanager
+def document_path(path_to_file: Path) -> Iterator[Path]:
+    # .doc конвертируется один раз (с кешем конвертера), все стратегии читают один и тот же .docx
+    if path_to_file.suffix.lower() != ".doc":
+        yield path_to_file
+        return
+
+    with tempfile.TemporaryDirectory(prefix="doc-") as tmp_dir:
+        yield get_conversion_service().convert(path_to_file, Path(tmp_dir))
+
+
+def parse_with_strategies(path_to_file: Path) -> list[str] | None:
+    # Товары файла лучшей стратегией; None - для формата файла нет ни одной стратегии
+    strategies = applicable_strategies(path_to_file)
+    if not strategies:
+        return None
+
+    with document_path(path_to_file) as path:
+        strategy = select_strategy(path, strategies)
+        print(f"{path_to_file.name}: выбрана стратегия {strategy.name}")
+        PARSER_STRATEGY.inc(strategy=strategy.name)
+        start = time.perf_counter()
+        products = strategy.parse_file(path)
+
+    print(f"{path_to_file.name}: товаров {len(products)} за {time.perf_counter() - start:.2f} с")
+    return products
+
+
+def print_products(strategy: ParserStrategy, path_to_file: Path) -> None:
+    # Запуск одной стратегии скриптом (модули parsers/*_d на примерах из test_data)
+    if not path_to_file.exists():
+        print(f"File not found: {path_to_file}")
+        return
+
+    print(f"Processing file: {path_to_file.name}")
+    with document_path(path_to_file) as path:
+        records = strategy.parse(strategy.read(path))
+    if not records:
+        print("No data parsed!")
+    for record in records:
+        print(record)
@@ -1,71 +1,42 @@
-import docx
-import re
 from pathlib import Path
-import importlib.util
+import sys
 
+# При запуске скриптом из своего каталога корень проекта добавляется в sys.path
 BASE_DIR = Path(__file__).resolve().parents[2]
-SETTINGS_PATH = BASE_DIR / "settings.py"
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-spec = importlib.util.spec_from_file_location("settings", SETTINGS_PATH)
-settings = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(settings)
+from common.segmentation import SegmentRules, segment_rows
+from parsers.strategy import WordStrategy, print_products, register
+from parsers.word_d.uniqe_doc import PRODUCT_NUMBER, numbered_product
 
 
-class StructuredDocxParser:
-    PRODUCT_NAMES = settings.product_names
+class NumberedRowRules(SegmentRules):
+    # Строка с номером "2.5" в первой ячейке открывает товар (наименование - вся строка),
+    # следующие строки - его характеристики, в том числе в следующих таблицах
+    include_start = False
 
-    def __init__(self, file_path):
-        self.file_path = Path(file_path)
-        self.data = []
+    def line(self, row):
+        row_text = [cell.strip().replace("\n", " ") for cell in row]
+        return row_text or None
 
-    def parse_docx(self):
-        print(f"Opening file: {self.file_path}")
-        doc = docx.Document(self.file_path)
+    def is_start(self, row_text) -> bool:
+        # !!! ПРОБЛЕМЫ С ПРОВЕРКОЙ ИМЕНИ !!!
+        return PRODUCT_NUMBER.match(row_text[0]) is not None
 
-        all_data = []
-        current_product = None
-        product_data = {}
+    def name(self, row_text) -> str:
+        return " | ".join(row_text)
 
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = [cell.text.strip().replace("\n", " ") for cell in row.cells]
-                row_combined = " | ".join(row_text)
-                # print(f"Row text: {row_combined}")  # Отладочный вывод
 
-                # Проверяем, является ли строка номером нового товара (пример: 2.5)
-                if re.match(r"^\d+\.\d+$", row_text[0]):
-                    # !!! ПРОБЛЕМЫ С ПРОВЕРКОЙ ИМЕНИ !!!
-                    if current_product:
-                        all_data.append(product_data)
-                    current_product = row_combined
-                    product_data = {"Номенклатура": current_product}
-                # Проверяем, является ли строка характеристикой товара (пример: 2.5.1, 2.5.2)
-                elif re.match(r"^\d+\.\d+\.\d+$", row_text[0]):
-                    product_data[row_text[0]] = row_combined
-                else:
-                    product_data[f"Характеристика {len(product_data)}"] = row_combined
+@register
+class MguStrategy(WordStrategy):
+    # ТЗ для МГУ: пронумерованные пункты "2.5" (товар) и "2.5.1" (характеристика) в таблицах
+    name = "tz_mgu"
 
-        if current_product:
-            all_data.append(product_data)
+    def parse(self, blocks):
+        rows = (row for rows in self.tables(blocks) for row in rows)
+        return [numbered_product(product.name, product.lines) for product in segment_rows(rows, NumberedRowRules())]
 
-        self.data = all_data
 
-    def print_data(self):
-        if not self.data:
-            print("No data parsed!")
-        for product in self.data:
-            print(product)
-
-    def process(self):
-        if not self.file_path.exists():
-            print(f"File not found: {self.file_path}")
-            return
-
-        print(f"Processing file: {self.file_path.name}")
-        self.parse_docx()
-        self.print_data()
-
-
-file_path = Path("..", "..", "test_data", "input", "ТЗ для МГУ.docx")  # Конкретный файл DOCX
-parser = StructuredDocxParser(file_path)
-parser.process()
\ No newline at end of file
+if __name__ == "__main__":
+    print_products(MguStrategy(), Path("..", "..", "test_data", "input", "ТЗ для МГУ.docx"))
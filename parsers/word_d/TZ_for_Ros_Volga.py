@@ -1,54 +1,26 @@
-import docx
 from pathlib import Path
-import importlib.util
+import sys
 
+# При запуске скриптом из своего каталога корень проекта добавляется в sys.path
 BASE_DIR = Path(__file__).resolve().parents[2]
-SETTINGS_PATH = BASE_DIR / "settings.py"
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-spec = importlib.util.spec_from_file_location("settings", SETTINGS_PATH)
-settings = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(settings)
+from parsers.strategy import print_products, register
+from parsers.word_d.uniqe_doc import UniqeDocStrategy
 
 
-class StructuredDocxParser:
-    PRODUCT_NAMES = settings.product_names
+@register
+class RosVolgaStrategy(UniqeDocStrategy):
+    # ТЗ для Рос Волга (и Туапсе): товар - каждая строка таблиц, в которой есть наименование
+    name = "tz_ros_volga"
 
-    def __init__(self, file_path):
-        self.file_path = Path(file_path)
-        self.data = []
+    def parse(self, blocks):
+        data = []
+        for rows in self.tables(blocks):
+            data.extend(self.parse_table_type3(rows))
+        return data
 
-    def parse_doc(self):
-        print(f"Opening file: {self.file_path}")
-        doc = docx.Document(self.file_path)
 
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = [cell.text.strip().replace("\n", ";").replace("\t", " ") for cell in row.cells]
-                row_combined = " | ".join(row_text)  # Разделяем ячейки для наглядности
-                print(f"Row text: {row_combined}")  # Отладочный вывод
-
-                # Проверяем, содержит ли строка товарное наименование
-                if any(name.lower() in row_combined.lower() for name in self.PRODUCT_NAMES):
-                    product_data = {"0": row_text}
-                    self.data.append(product_data)
-
-    def print_data(self):
-        if not self.data:
-            print("No data parsed!")
-        for product in self.data:
-            print(product)
-
-    def process(self):
-        if not self.file_path.exists():
-            print(f"File not found: {self.file_path}")
-            return
-
-        print(f"Processing file: {self.file_path.name}")
-        self.parse_doc()
-        self.print_data()
-
-
-# Использование
-file_path = Path("..", "..", "test_data", "input", "ТЗ для Рос Волга.docx")  # Конкретный файл DOC
-parser = StructuredDocxParser(file_path)
-parser.process()
+if __name__ == "__main__":
+    print_products(RosVolgaStrategy(), Path("..", "..", "test_data", "input", "ТЗ для Рос Волга.docx"))
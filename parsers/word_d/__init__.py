@@ -0,0 +1,4 @@
+# Модули регистрируют свои стратегии в parsers.strategy при импорте
+from . import TZ_for_MGU, TZ_for_Norilsky, TZ_for_Ros_Volga, TZ_for_Tyapse, uniqe_doc
+
+__all__ = ["TZ_for_MGU", "TZ_for_Norilsky", "TZ_for_Ros_Volga", "TZ_for_Tyapse", "uniqe_doc"]
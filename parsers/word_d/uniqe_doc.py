@@ -1,176 +1,158 @@
-import docx
 import re
 from pathlib import Path
-import importlib.util
+import sys
 
-# Общие настройки и пути
+# При запуске скриптом из своего каталога корень проекта добавляется в sys.path
 BASE_DIR = Path(__file__).resolve().parents[2]
-SETTINGS_PATH = BASE_DIR / "settings.py"
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-spec = importlib.util.spec_from_file_location("settings", SETTINGS_PATH)
-settings = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(settings)
+from common.docx_reader import BLOCK_TABLE
+from common.keywords import KEYWORDS
+from common.paragraphs import segment_paragraphs
+from common.segmentation import SegmentRules, segment_rows
+from parsers.strategy import WordStrategy, print_products, register
 
+# Номер товара ("2.5") и номер его характеристики ("2.5.1") в первой ячейке строки
+PRODUCT_NUMBER = re.compile(r"^\d+\.\d+$")
+CHARACTERISTIC_NUMBER = re.compile(r"^\d+\.\d+\.\d+$")
 
-class StructuredDocxParser:
-    PRODUCT_NAMES = settings.product_names
 
-    def __init__(self, file_path):
-        self.file_path = Path(file_path)
-        self.data = []
+class NumberedRowRules(SegmentRules):
+    # Таблица с нумерацией пунктов: строка "2.5" открывает товар, следующие строки - его характеристики
+    include_start = False
 
-    def parse_table_type1(self, table):
+    def line(self, row):
+        row_text = [cell.strip().replace("\n", " ") for cell in row]
+        return row_text if row_text and row_text[0] else None
+
+    def is_start(self, row_text) -> bool:
+        return PRODUCT_NUMBER.match(row_text[0]) is not None
+
+    def name(self, row_text) -> str:
+        return row_text[0]
+
+
+class NameColumnRules(SegmentRules):
+    # Таблица с колонкой "наименование": строка с именем товара в этой колонке открывает товар
+    include_start = False
+
+    def __init__(self, name_column: int):
+        self.name_column = name_column
+
+    def line(self, row):
+        row_text = [cell.strip().replace("\n", " ").replace("\t", " ") for cell in row]
+        return row_text if self.name_column < len(row_text) else None
+
+    def is_start(self, row_text) -> bool:
+        return KEYWORDS.contains_product_name(row_text[self.name_column])
+
+    def name(self, row_text) -> str:
+        return row_text[self.name_column]
+
+
+def numbered_product(name: str, rows: list[list[str]]) -> dict:
+    # Запись товара из пронумерованной таблицы: характеристики "2.5.1" по номеру, остальные строки по порядку
+    product_data = {"Номенклатура": name}
+    for row_text in rows:
+        # Характеристика товара (пример: 2.5.1)
+        if CHARACTERISTIC_NUMBER.match(row_text[0]):
+            product_data[row_text[0]] = " | ".join(row_text)
+        else:
+            product_data[f"Характеристика {len(product_data)}"] = " | ".join(row_text)
+    return product_data
+
+
+@register
+class UniqeDocStrategy(WordStrategy):
+    """
+    Универсальная стратегия для ТЗ в .docx: тип каждой таблицы определяется по первой ячейке
+    (пронумерованные пункты, колонка "наименование" или строки с наименованиями),
+    описания товаров вне таблиц берутся из абзацев.
+    """
+    name = "uniqe_doc"
+
+    def parse_table_type1(self, rows):
         """
         Парсинг таблиц по логике первого парсера:
         - Если первая ячейка строки соответствует формату "2.5" – новый товар.
         - Если соответствует формату "2.5.1" – характеристика товара.
         - Иначе – доп. характеристика.
         """
-        results = []
-        current_product = None
-        product_data = {}
-        for row in table.rows:
-            row_text = [cell.text.strip().replace("\n", " ") for cell in row.cells]
-            if not row_text or not row_text[0]:
-                continue
-            # Новый товар (пример: 2.5)
-            if re.match(r"^\d+\.\d+$", row_text[0]):
-                if current_product:
-                    results.append(product_data)
-                current_product = row_text[0]
-                product_data = {"Номенклатура": row_text[0]}
-            # Характеристика товара (пример: 2.5.1)
-            elif re.match(r"^\d+\.\d+\.\d+$", row_text[0]):
-                product_data[row_text[0]] = " | ".join(row_text)
-            else:
-                product_data[f"Характеристика {len(product_data)}"] = " | ".join(row_text)
-        if current_product:
-            results.append(product_data)
-        return results
+        return [numbered_product(product.name, product.lines) for product in segment_rows(rows, NumberedRowRules())]
 
-    def parse_table_type2(self, table):
+    def parse_table_type2(self, rows):
         """
         Парсинг таблиц по логике второго парсера:
         - Определяется колонка с заголовком, содержащим "наименование".
-        - При нахождении строки с именем товара из PRODUCT_NAMES создаётся новый блок,
+        - При нахождении строки с именем товара из KEYWORDS создаётся новый блок,
           остальные строки добавляются как характеристики.
         """
-        results = []
-        header_cells = table.rows[0].cells
         name_column = None
-        for col_idx, cell in enumerate(header_cells):
-            if "наименование" in cell.text.lower():
+        for col_idx, cell in enumerate(rows[0]):
+            if "наименование" in cell.lower():
                 name_column = col_idx
                 break
         if name_column is None:
-            return results
-
-        current_product = None
-        product_data = {}
-        for row in table.rows:
-            row_text = [cell.text.strip().replace("\n", " ").replace("\t", " ") for cell in row.cells]
-            if name_column < len(row_text):
-                product_name = row_text[name_column]
-                if any(name.lower() in product_name.lower() for name in self.PRODUCT_NAMES):
-                    if current_product:
-                        results.append(product_data)
-                    current_product = product_name
-                    product_data = {"0": product_name, "Характеристики": []}
-                elif current_product:
-                    product_data["Характеристики"].append(" ".join(row_text))
-        if current_product:
-            results.append(product_data)
-        return results
+            return []
 
-    def parse_table_type3(self, table):
+        return [
+            {"0": product.name, "Характеристики": [" ".join(row_text) for row_text in product.lines]}
+            for product in segment_rows(rows, NameColumnRules(name_column))
+        ]
+
+    def parse_table_type3(self, rows):
         """
         Парсинг таблиц по логике третьего и четвёртого парсеров:
         - Если объединённый текст строки содержит одно из наименований,
           строка считается информационной.
         """
         results = []
-        for row in table.rows:
-            row_text = [cell.text.strip().replace("\n", ";").replace("\t", " ") for cell in row.cells]
+        for row in rows:
+            row_text = [cell.strip().replace("\n", ";").replace("\t", " ") for cell in row]
             row_combined = " | ".join(row_text)
-            if any(name.lower() in row_combined.lower() for name in self.PRODUCT_NAMES):
+            if KEYWORDS.contains_product_name(row_combined):
                 product_data = {"0": row_text}
                 results.append(product_data)
         return results
 
-    def parse_paragraphs(self, doc):
+    def parse_paragraphs(self, paragraphs):
         """
         Дополнительная обработка текста вне таблиц (как во втором парсере).
-        Из полного текста ищется фрагмент от наименования до слова "гарантия".
+        Каждое описание товара - от наименования (или пункта "2.5" с наименованием)
+        до следующего товара или пункта с "гарантия", см. common.paragraphs.
         """
-        results = []
-        full_text = " ".join([p.text for p in doc.paragraphs])
-        lower_text = full_text.lower()
-        for name in self.PRODUCT_NAMES:
-            if name.lower() in lower_text:
-                start_idx = lower_text.find(name.lower())
-                end_idx = lower_text.find("гарантия", start_idx)
-                product_text = full_text[start_idx:end_idx] if end_idx != -1 else full_text[start_idx:]
-                results.append({"0": name, "Характеристики": product_text})
-        return results
+        # Первая строка описания - само наименование, в характеристики она не повторяется
+        return [{"0": product.name, "Характеристики": " ".join(product.lines[1:])}
+                for product in segment_paragraphs(paragraphs)]
+
+    def parse(self, blocks):
+        # Таблицы и абзацы за один проход по документу
+        data = []
+        paragraphs = []
+        for block in blocks:
+            if block.kind != BLOCK_TABLE:
+                paragraphs.append(block.text)
+                continue
 
-    def parse_doc(self):
-        print(f"Opening file: {self.file_path}")
-        doc = docx.Document(self.file_path)
-        # Обработка таблиц
-        for table in doc.tables:
             # Определяем тип таблицы по первой ячейке первого ряда
-            if table.rows and table.rows[0].cells:
-                first_cell_text = table.rows[0].cells[0].text.lower()
-                if "наименование" in first_cell_text:
-                    table_type = 2
-                elif re.match(r"^\d+\.\d+$", first_cell_text):
-                    table_type = 1
-                else:
-                    table_type = 3
-            else:
+            rows = block.rows
+            if not rows or not rows[0]:
                 continue
 
-            if table_type == 1:
-                self.data.extend(self.parse_table_type1(table))
-            elif table_type == 2:
-                self.data.extend(self.parse_table_type2(table))
-            elif table_type == 3:
-                self.data.extend(self.parse_table_type3(table))
+            first_cell_text = rows[0][0].lower()
+            if "наименование" in first_cell_text:
+                data.extend(self.parse_table_type2(rows))
+            elif PRODUCT_NUMBER.match(first_cell_text):
+                data.extend(self.parse_table_type1(rows))
+            else:
+                data.extend(self.parse_table_type3(rows))
         # Обработка текста вне таблиц
-        self.data.extend(self.parse_paragraphs(doc))
+        data.extend(self.parse_paragraphs(paragraphs))
+        return data
 
-    def print_data(self):
-        if not self.data:
-            print("No data parsed!")
-        for product in self.data:
-            print(product)
 
-    def process(self):
+if __name__ == "__main__":
+    for file_name in ("ТЗ для МГУ.docx", "ТЗ для Рос Волга.docx", "ТЗ для Туапсе.docx", "ТЗ Норильский транспорт.docx"):
         print()
-        if not self.file_path.exists():
-            print(f"File not found: {self.file_path}")
-            return
-        print(f"Processing file: {self.file_path.name}")
-        self.parse_doc()
-        self.print_data()
-
-
-# 1
-file_path = Path("..", "..", "test_data", "input", "ТЗ для МГУ.docx")
-parser = StructuredDocxParser(file_path)
-parser.process()
-
-# 2
-file_path = Path("..", "..", "test_data", "input", "ТЗ для Рос Волга.docx")
-parser = StructuredDocxParser(file_path)
-parser.process()
-
-# 3
-file_path = Path("..", "..", "test_data", "input", "ТЗ для Туапсе.docx")
-parser = StructuredDocxParser(file_path)
-parser.process()
-
-# 4
-file_path = Path("..", "..", "test_data", "input", "ТЗ Норильский транспорт.docx")
-parser = StructuredDocxParser(file_path)
-parser.process()
+        print_products(UniqeDocStrategy(), Path("..", "..", "test_data", "input", file_name))
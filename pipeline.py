@@ -0,0 +1,232 @@
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+import main
+import run_models
+import settings
+from common.constants import DIR_DATA_OUTPUT
+from common.helpers import create_intermediate_xlsx, products_to_dataframe
+from common.metrics import EXCEL_WRITE_SECONDS
+from common.profiling import Profiler
+from common.storage import atomic_path
+from parsers.base import TableParser
+from parsers.doc import DocParser, document_tables
+from parsers.pdf import ParserPDF, page_tables
+from parsers.strategy import ExcelStrategy, PdfStrategy, WordStrategy, parse_with_strategies, register
+
+
+final_columns = ["Номенклатура", "Мощность, Вт", "Св. поток, Лм", "IP", "Габариты", "Длина, мм",
+                 "Ширина, мм", "Высота, мм", "Рассеиватель", "Цвет. температура, К", "Вес, кг",
+                 "Напряжение, В", "Температура эксплуатации", "Срок службы (работы) светильника",
+                 "Тип КСС", "Род тока", "Гарантия", "Индекс цветопередачи (CRI, Ra)", "Цвет корпуса",
+                 "Коэффициент пульсаций", "Коэффициент мощности (Pf)", "Класс взрывозащиты (Ex)",
+                 "Класс пожароопасности", "Класс защиты от поражения электрическим током",
+                 "Материал корпуса", "Тип", "Прочее"]
+
+SOURCE_COLUMN = "Файл-источник"
+POSITION_COLUMN = "№ в источнике"
+batch_columns = [SOURCE_COLUMN, POSITION_COLUMN] + final_columns
+
+
+def segment_products(product_data: dict) -> list[dict]:
+    # Товары doc/docx/pdf передаются в сегментацию в памяти; промежуточный файл пишется только для отладки
+    parser = run_models.UnifiedExcelParser(Path())
+    parser.parse_dataframe(products_to_dataframe(product_data))
+    return parser.data
+
+
+def save_intermediate(product_data: dict, input_file_path: Path) -> Path:
+    # Отдельный каталог на задачу: параллельные загрузки не пишут в один файл
+    job_dir = Path(DIR_DATA_OUTPUT, f"{input_file_path.stem}-{uuid.uuid4().hex[:8]}")
+    job_dir.mkdir(parents=True, exist_ok=True)
+    path = job_dir / "intermediate.xlsx"
+    create_intermediate_xlsx(path)
+    main.save_data_to_excel(product_data, path)
+    print(f"Промежуточный файл для отладки: {path}")
+    return path
+
+
+@register
+class ExcelTablesStrategy(ExcelStrategy):
+    # Общий парсер Excel (run_models.UnifiedExcelParser): на всём файле читает все листы потоково
+    name = "excel"
+    priority = 1
+
+    def parse(self, df: pd.DataFrame) -> list[dict]:
+        parser = run_models.UnifiedExcelParser(Path())
+        parser.parse_dataframe(df)
+        return parser.data
+
+    def parse_file(self, path_to_file: Path) -> list[str]:
+        parser = run_models.UnifiedExcelParser(path_to_file)
+        parser.process()
+        return self.texts(parser.data)
+
+
+@register
+class DocTablesStrategy(WordStrategy):
+    # Общий парсер doc/docx (parsers.doc.DocParser): только ячейки таблиц
+    name = "docx"
+    priority = 1
+
+    def parse(self, blocks) -> list[dict]:
+        return segment_products(TableParser(document_tables(blocks)))
+
+    def parse_file(self, path_to_file: Path) -> list[str]:
+        product_data = DocParser(path_to_file)
+        if settings.save_intermediate_xlsx:
+            save_intermediate(product_data, path_to_file)
+        return self.texts(segment_products(product_data))
+
+
+@register
+class PdfTablesStrategy(PdfStrategy):
+    # Общий парсер pdf (parsers.pdf.ParserPDF): самая крупная таблица каждой страницы
+    name = "pdf"
+    priority = 1
+    all_tables = False
+
+    def parse(self, pages) -> list[dict]:
+        return segment_products(TableParser(page_tables(pages)))
+
+    def parse_file(self, path_to_file: Path) -> list[str]:
+        product_data = ParserPDF(path_to_file)
+        if settings.save_intermediate_xlsx:
+            save_intermediate(product_data, path_to_file)
+        return self.texts(segment_products(product_data))
+
+
+def parse_products(input_file_path: Path) -> list[dict] | None:
+    # Точка входа в парсер: лучшая для файла стратегия из реестра (parsers/strategy.py)
+    products = parse_with_strategies(input_file_path)
+    if products is None:
+        return None
+
+    return [{"text": text} for text in products]
+
+
+def extract_product(product_text: str) -> dict:
+    print(f"Распознанный товар: {product_text=}")
+    extracted = run_models.extract_gemma_2_2b_it_IQ3_M(product_text, final_columns)
+
+    if not extracted or not isinstance(extracted, dict) or len(extracted) == 0:
+        extracted = {col: "не указано" for col in final_columns}
+    else:
+        # Проверка, что все ключи есть
+        for col in final_columns:
+            if col not in extracted:
+                extracted[col] = "не указано"
+    print(f"Извлечённый товар: {extracted=}")
+    return extracted
+
+
+def parse_source(input_file_path: Path) -> list[dict] | Exception:
+    # Файл пакета: ошибка разбора одного источника не должна ронять весь пакет
+    try:
+        parsed_products = parse_products(input_file_path)
+
+    except Exception as e:
+        print(f"Ошибка разбора {input_file_path}: {e}")
+        return e
+
+    if parsed_products is None:
+        return ValueError("Не удалось найти парсер.")
+
+    return parsed_products
+
+
+def build_queue(input_file_paths: list[tuple[str, Path]],
+                parsed: list[list[dict] | Exception]) -> list[tuple[str, int, str]]:
+    # Общая очередь извлечения: товары всех файлов подряд
+    queue = []
+    for (source_name, _), parsed_products in zip(input_file_paths, parsed):
+        if isinstance(parsed_products, Exception):
+            continue
+        for position, product in enumerate(parsed_products, start=1):
+            queue.append((source_name, position, product["text"]))
+
+    return queue
+
+
+def extract_queue(queue: list[tuple[str, int, str]]) -> list[dict]:
+    filled_forms = []
+
+    for source_name, position, product_text in queue:
+        extracted = extract_product(product_text)
+        extracted[SOURCE_COLUMN] = source_name
+        extracted[POSITION_COLUMN] = position
+        filled_forms.append(extracted)
+
+    return filled_forms
+
+
+def failed_sources(input_file_paths: list[tuple[str, Path]], parsed: list[list[dict] | Exception]) -> list[dict]:
+    # Неразобранные файлы попадают в книгу строкой с ошибкой, чтобы их не потеряли в пакете
+    failed = []
+    for (source_name, _), parsed_products in zip(input_file_paths, parsed):
+        if isinstance(parsed_products, Exception):
+            row = {col: "не указано" for col in final_columns}
+            row["Номенклатура"] = f"Не удалось разобрать файл: {parsed_products}"
+            row[SOURCE_COLUMN] = source_name
+            row[POSITION_COLUMN] = None
+            failed.append(row)
+
+    return failed
+
+
+def save_output(df_form: pd.DataFrame, output_file: Path, columns: list[str],
+                filter_columns: list[str] | None = None) -> None:
+    # ФИЛЬТР!!! Колонки источника в подсчёт характеристик не входят
+    if filter_columns is None:
+        df_form_filtered = run_models.out_filter_dataframe(df_form)
+    else:
+        df_form_filtered = df_form.loc[run_models.out_filter_dataframe(df_form[filter_columns]).index]
+
+    # Книга пишется во временный файл и переименовывается, чтобы недописанный результат нельзя было скачать
+    with EXCEL_WRITE_SECONDS.time(), atomic_path(output_file) as tmp_file:
+        # Новый способ создания книги с несколькими листами в excel
+        with pd.ExcelWriter(tmp_file, engine="openpyxl") as writer:
+            df_form_filtered.to_excel(writer, index=False, sheet_name="Filtered", columns=columns)
+            df_form.to_excel(writer, index=False, sheet_name="All", columns=columns)
+
+        # Запись данных в лист/книгу excel
+        run_models.append_df_to_excel(tmp_file, df_form_filtered, sheet_name="Filtered")
+        run_models.append_df_to_excel(tmp_file, df_form, sheet_name="All")
+    print(f"\nДанные успешно добавлены в файл {output_file}.")
+
+
+def process_job(payload: dict) -> dict:
+    """
+    Выполняет задачу из очереди (распределённый режим): парсинг, извлечение и запись книги.
+    payload: {"inputs": [[имя источника, путь], ...], "output_file": путь, "batch": bool, "profile": bool}.
+    """
+    input_file_paths = [(source_name, Path(path)) for source_name, path in payload["inputs"]]
+    output_file = Path(payload["output_file"])
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    profiler = Profiler(payload.get("profile", False))
+
+    if payload["batch"]:
+        with profiler.stage("parse"):
+            parsed = [parse_source(path) for _, path in input_file_paths]
+        with profiler.stage("extract"):
+            filled_forms = (extract_queue(build_queue(input_file_paths, parsed))
+                            + failed_sources(input_file_paths, parsed))
+        df_form = pd.DataFrame(filled_forms, columns=batch_columns)
+        with profiler.stage("excel"):
+            save_output(df_form, output_file, batch_columns, filter_columns=final_columns)
+    else:
+        with profiler.stage("parse"):
+            parsed_products = parse_products(input_file_paths[0][1])
+        if parsed_products is None:
+            raise ValueError("Не удалось найти парсер.")
+        with profiler.stage("extract"):
+            filled_forms = [extract_product(product["text"]) for product in parsed_products]
+        df_form = pd.DataFrame(filled_forms, columns=final_columns)
+        with profiler.stage("excel"):
+            save_output(df_form, output_file, final_columns)
+
+    profiler.save(output_file.parent, output_file.stem)
+    return {"output_file": str(output_file)}
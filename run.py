@@ -1,28 +1,78 @@
+import asyncio
+import hashlib
 import uvicorn
-from fastapi import FastAPI, UploadFile, File, Request
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse
+from fastapi import FastAPI, UploadFile, File, Form, Query, Request
+from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 import multiprocessing
 import pandas as pd
-import shutil
 import run_models
 from pathlib import Path
-from common.constants import CWD
-import main
+from common.constants import PARSER_VERSION, DIR_UPLOADS, DIR_DOWNLOADS, STORAGE_CLEANUP_INTERVAL
+from common.uploads import save_upload, UploadRejected
+from common.cache import ResultCache, make_result_key
+from common.conversion import get_conversion_service
+from common.archives import extract_archive, ArchiveRejected
+from common.storage import StorageManager, make_shard_path, find_stored_file
+from common.metrics import UPLOAD_SIZE, render_metrics
+from common.profiling import Profiler
+from common.jobs import make_job_queue, LocalJobQueue, STATUS_DONE, STATUS_FAILED
+from pipeline import (final_columns, batch_columns, parse_products, parse_source, extract_product, build_queue,
+                      extract_queue, failed_sources, save_output)
+import settings
+import worker
 
 
-final_columns = ["Номенклатура", "Мощность, Вт", "Св. поток, Лм", "IP", "Габариты", "Длина, мм",
-                 "Ширина, мм", "Высота, мм", "Рассеиватель", "Цвет. температура, К", "Вес, кг",
-                 "Напряжение, В", "Температура эксплуатации", "Срок службы (работы) светильника",
-                 "Тип КСС", "Род тока", "Гарантия", "Индекс цветопередачи (CRI, Ra)", "Цвет корпуса",
-                 "Коэффициент пульсаций", "Коэффициент мощности (Pf)", "Класс взрывозащиты (Ex)",
-                 "Класс пожароопасности", "Класс защиты от поражения электрическим током",
-                 "Материал корпуса", "Тип", "Прочее"]
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
-allowed_extensions = {".doc", ".docx", ".xlsx", ".xls", ".xlsm", ".pdf"}
+allowed_extensions = {".doc", ".docx", ".xlsx", ".xls", ".xlsm", ".ods", ".pdf"}
 
 app = FastAPI()
 templates = Jinja2Templates(directory="templates")
+result_cache = ResultCache()
+# Распределённый режим: веб-узел только ставит задачи в очередь и отдаёт результаты (см. worker.py)
+job_queue = make_job_queue(settings.job_queue_path)
+
+
+def pending_job_inputs() -> set[Path]:
+    # Загрузки задач, которые ещё ждут воркера, не должны попасть под очистку хранилища
+    if job_queue is None:
+        return set()
+
+    return {Path(path) for job in job_queue.pending() for _, path in job.payload["inputs"]}
+
+
+storage_manager = StorageManager(protected=pending_job_inputs)
+
+
+@app.on_event("startup")
+async def start_local_worker() -> None:
+    if isinstance(job_queue, LocalJobQueue):
+        worker.start_local_worker(job_queue)
+
+
+@app.on_event("startup")
+async def start_doc_conversion() -> None:
+    # Без очереди файлы разбираются прямо в веб-процессе: пул конвертеров .doc прогревается при старте
+    if job_queue is None:
+        get_conversion_service().start()
+
+
+async def storage_cleanup_loop() -> None:
+    while True:
+        try:
+            await asyncio.to_thread(storage_manager.cleanup)
+
+        except Exception as e:
+            print(f"Ошибка очистки хранилища: {e}")
+
+        await asyncio.sleep(STORAGE_CLEANUP_INTERVAL)
+
+
+@app.on_event("startup")
+async def start_storage_cleanup() -> None:
+    # Фоновая очистка uploads/ и downloads/ по возрасту и квоте
+    app.state.storage_cleanup = asyncio.create_task(storage_cleanup_loop())
 
 
 # Главная страница
@@ -31,82 +81,211 @@ async def read_root(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 
+def process_upload(input_file_path: Path, output_file: Path, cache_key: str, profile: bool) -> list[Path] | None:
+    # Синхронная обработка одного файла; None - для файла не нашлось парсера
+    profiler = Profiler(profile)
+    with profiler.stage("parse"):
+        parsed_products = parse_products(input_file_path)
+    if parsed_products is None:
+        return None
+
+    # На вход подаётся список со словарями, где [{"text": "Имя...характеристики"}, ...], 1 словарь = 1 позиция товара
+    with profiler.stage("extract"):
+        filled_forms = [extract_product(product["text"]) for product in parsed_products]
+
+    df_form = pd.DataFrame(filled_forms, columns=final_columns)
+    with profiler.stage("excel"):
+        save_output(df_form, output_file, final_columns)
+    result_cache.put(cache_key, output_file)
+    return profiler.save(output_file.parent, output_file.stem)
+
+
 @app.post("/old/upload", response_class=HTMLResponse)
-async def upload_file(request: Request, file: UploadFile = File(...)):
+async def upload_file(request: Request, file: UploadFile = File(...), force: bool = Form(False),
+                      profile: bool = Query(False)):
     # Если файл не загружен или неподдерживаемый код файла
     if not file or not any(file.filename.endswith(ext) for ext in allowed_extensions):
         return RedirectResponse(url="/?message=Невозможно обработать данный файл", status_code=401)
 
-    upload_folder = Path("uploads")
-    upload_folder.mkdir(exist_ok=True)
-    input_file_path = upload_folder / run_models.generate_filename(Path(file.filename).stem,
-                                                                   Path(file.filename).suffix.lower())
+    input_file_path = make_shard_path(DIR_UPLOADS, run_models.generate_filename(Path(file.filename).stem,
+                                                                              Path(file.filename).suffix.lower()))
     print(f"{input_file_path=}")
-    with open(input_file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    # Функция определения расширения файла (точка входа в парсер)
-    ext = input_file_path.suffix.lower()
-    if ext in [".xlsx", ".xls", ".xlsm"]:
-        parser = run_models.UnifiedExcelParser(input_file_path)
-        parser.process()
-    elif ext in [".doc", ".docx", ".pdf"]:
-        main.main(input_file_path)
-        parser = run_models.UnifiedExcelParser(Path(CWD, 'test_data', 'output', 'intermediate.xlsx'))
-        parser.process()
-    else:
+    try:
+        upload = await save_upload(file, input_file_path)
+    except UploadRejected as e:
+        return templates.TemplateResponse("index.html", {"request": request, "message": str(e)},
+                                          status_code=e.status_code)
+    print(f"Файл сохранён: {upload.size} байт, sha256={upload.sha256}")
+    UPLOAD_SIZE.observe(upload.size, ext=input_file_path.suffix.lower())
+
+    output_filename = run_models.generate_filename()
+    output_file = make_shard_path(DIR_DOWNLOADS, output_filename)
+
+    # Профилирование: ?profile=1 или заголовок X-Profile: 1, результат не берётся из кеша
+    profile = profile or request.headers.get("X-Profile", "").lower() in ("1", "true")
+
+    # Повторная загрузка того же файла отдаётся из кеша без парсинга и модели
+    cache_key = make_result_key(upload.sha256, PARSER_VERSION, run_models.MODEL_NAME,
+                                run_models.input_prompt + "|".join(final_columns))
+    if force or profile:
+        await asyncio.to_thread(result_cache.delete, cache_key)
+    elif await asyncio.to_thread(result_cache.get, cache_key, output_file):
+        print(f"\nРезультат взят из кеша: {output_file}.")
+        return templates.TemplateResponse("result.html", {
+                                            "request": request,
+                                            "output_file": str(output_filename),
+                                            "download_url": f'/old/download/{output_filename}'})
+
+    if job_queue is not None:
+        return enqueue_job(request, [(Path(file.filename).name, input_file_path)], output_file, cache_key,
+                           batch=False, profile=profile)
+
+    # Парсинг, модель и запись книги - в потоке, чтобы медленный файл не останавливал остальные запросы
+    profile_files = await asyncio.to_thread(process_upload, input_file_path, output_file, cache_key, profile)
+    if profile_files is None:
         return templates.TemplateResponse("index.html",
                                           {"request": request, "message": "Не удалось найти парсер."})
 
-    filled_forms = []
+    return templates.TemplateResponse("result.html",{
+                                        "request": request,
+                                        "output_file": str(output_filename),
+                                        "download_url": f'/old/download/{output_filename}',
+                                        "profile_files": [path.name for path in profile_files]})
 
-    # На вход подаётся список со словарями, где [{"text": "Имя...характеристики"}, ...], 1 словарь = 1 позиция товара
-    for product in parser.data:
-        product_text = product["text"]
-        print(f"Распознанный товар: {product_text=}")
-        extracted = run_models.extract_gemma_2_2b_it_IQ3_M(product_text, final_columns)
 
-        if not extracted or not isinstance(extracted, dict) or len(extracted) == 0:
-            extracted = {col: "не указано" for col in final_columns}
+@app.post("/old/upload_batch", response_class=HTMLResponse)
+async def upload_batch(request: Request, files: list[UploadFile] = File(...), force: bool = Form(False)):
+    """
+    Пакетная загрузка: несколько файлов и/или ZIP-архивов.
+    Файлы парсятся параллельно, все товары проходят через одну очередь извлечения
+    и попадают в одну книгу с колонками источника.
+    """
+    input_file_paths = []
+    batch_sha256 = hashlib.sha256()
+
+    for file in files:
+        suffix = Path(file.filename).suffix.lower()
+        if suffix not in allowed_extensions and suffix != ".zip":
+            return templates.TemplateResponse("index.html",
+                                              {"request": request,
+                                               "message": f"Невозможно обработать файл {file.filename}"},
+                                              status_code=415)
+
+        input_file_path = make_shard_path(DIR_UPLOADS, run_models.generate_filename(Path(file.filename).stem, suffix))
+        try:
+            upload = await save_upload(file, input_file_path)
+        except UploadRejected as e:
+            return templates.TemplateResponse("index.html",
+                                              {"request": request, "message": f"{file.filename}: {e}"},
+                                              status_code=e.status_code)
+        batch_sha256.update(upload.sha256.encode())
+        UPLOAD_SIZE.observe(upload.size, ext=suffix)
+
+        if suffix == ".zip":
+            try:
+                input_file_paths.extend(await asyncio.to_thread(extract_archive, input_file_path,
+                                                                allowed_extensions))
+            except ArchiveRejected as e:
+                return templates.TemplateResponse("index.html",
+                                                  {"request": request, "message": f"{file.filename}: {e}"},
+                                                  status_code=e.status_code)
         else:
-            # Проверка, что все ключи есть
-            for col in final_columns:
-                if col not in extracted:
-                    extracted[col] = "не указано"
-        print(f"Извлечённый товар: {extracted=}")
-        filled_forms.append(extracted)
+            input_file_paths.append((Path(file.filename).name, input_file_path))
 
+    if not input_file_paths:
+        return templates.TemplateResponse("index.html",
+                                          {"request": request, "message": "В загрузке нет поддерживаемых файлов"},
+                                          status_code=415)
 
-    df_form = pd.DataFrame(filled_forms, columns=final_columns)
-    # ФИЛЬТР!!!
-    df_form_filtered = run_models.out_filter_dataframe(df_form)
-    output_folder = Path("downloads")
-    output_folder.mkdir(exist_ok=True)
-    output_filename = run_models.generate_filename()
-    output_file = output_folder / output_filename
+    output_filename = run_models.generate_filename("Форма2-пакет")
+    output_file = make_shard_path(DIR_DOWNLOADS, output_filename)
 
-    # Новый способ создания книги с несколькими листами в excel
-    with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
-        df_form_filtered.to_excel(writer, index=False, sheet_name="Filtered", columns=final_columns)
-        df_form.to_excel(writer, index=False, sheet_name="All", columns=final_columns)
+    cache_key = make_result_key(batch_sha256.hexdigest(), PARSER_VERSION, run_models.MODEL_NAME,
+                                run_models.input_prompt + "|".join(batch_columns))
+    if force:
+        await asyncio.to_thread(result_cache.delete, cache_key)
+    elif await asyncio.to_thread(result_cache.get, cache_key, output_file):
+        print(f"\nРезультат взят из кеша: {output_file}.")
+        return templates.TemplateResponse("result.html", {
+                                            "request": request,
+                                            "output_file": str(output_filename),
+                                            "download_url": f'/old/download/{output_filename}'})
 
-    # Запись данных в лист/книгу excel
-    run_models.append_df_to_excel(output_file, df_form_filtered, sheet_name="Filtered")
-    run_models.append_df_to_excel(output_file, df_form, sheet_name="All")
-    print(f"\nДанные успешно добавлены в файл {output_file}.")
-    return templates.TemplateResponse("result.html",{
+    if job_queue is not None:
+        return enqueue_job(request, input_file_paths, output_file, cache_key, batch=True)
+
+    # Парсинг всех файлов параллельно, порядок источников сохраняется; ошибки остаются у своего источника
+    parsed = await asyncio.gather(*(asyncio.to_thread(parse_source, path) for _, path in input_file_paths))
+
+    queue = build_queue(input_file_paths, parsed)
+
+    filled_forms = await asyncio.to_thread(extract_queue, queue) + failed_sources(input_file_paths, parsed)
+
+    df_form = pd.DataFrame(filled_forms, columns=batch_columns)
+    await asyncio.to_thread(save_output, df_form, output_file, batch_columns, filter_columns=final_columns)
+    await asyncio.to_thread(result_cache.put, cache_key, output_file)
+    return templates.TemplateResponse("result.html", {
                                         "request": request,
                                         "output_file": str(output_filename),
                                         "download_url": f'/old/download/{output_filename}'})
 
 
+def enqueue_job(request: Request, input_file_paths: list[tuple[str, Path]], output_file: Path, cache_key: str,
+                batch: bool, profile: bool = False) -> HTMLResponse:
+    job_id = job_queue.enqueue({
+        "inputs": [[source_name, str(path)] for source_name, path in input_file_paths],
+        "output_file": str(output_file),
+        "cache_key": cache_key,
+        "batch": batch,
+        "profile": profile,
+    })
+    print(f"Задача {job_id} поставлена в очередь")
+    return templates.TemplateResponse("job.html", {"request": request, "status_url": f"/old/jobs/{job_id}"})
+
+
+# Статус задачи в распределённом режиме: страница сама обновляется, пока задача не завершится
+@app.get("/old/jobs/{job_id}", response_class=HTMLResponse)
+async def job_status(request: Request, job_id: str):
+    job = job_queue.get(job_id) if job_queue is not None else None
+    if job is None:
+        return templates.TemplateResponse("index.html", {"request": request, "message": "Задача не найдена"},
+                                          status_code=404)
+
+    if job.status == STATUS_DONE:
+        output_filename = Path(job.result["output_file"]).name
+        return templates.TemplateResponse("result.html", {
+                                            "request": request,
+                                            "output_file": output_filename,
+                                            "download_url": f'/old/download/{output_filename}'})
+
+    if job.status == STATUS_FAILED:
+        return templates.TemplateResponse("index.html",
+                                          {"request": request, "message": f"Ошибка обработки: {job.error}"})
+
+    return templates.TemplateResponse("job.html", {"request": request, "status_url": f"/old/jobs/{job_id}"})
+
+
+# Метрики в текстовом формате Prometheus
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Отчёт о занятом месте в uploads/ и downloads/
+@app.get("/old/storage")
+async def storage_report():
+    return await asyncio.to_thread(storage_manager.report)
+
+
 # Эндпоинт для скачивания файла
 @app.get("/old/download/{filename}", response_class=FileResponse)
 async def download_file(filename: str):
-    file_path = Path("downloads") / filename
-    if not file_path.exists():
+    file_path = find_stored_file(DIR_DOWNLOADS, filename)
+    if file_path is None:
         return {"error": "Файл не найден"}
-    return FileResponse(path=file_path, filename=filename, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    # Кроме книг Excel здесь же лежат файлы профилирования (.prof, .folded, .json)
+    media_type = XLSX_MEDIA_TYPE if file_path.suffix == ".xlsx" else "application/octet-stream"
+    return FileResponse(path=file_path, filename=filename, media_type=media_type)
 
 
 def run_server() -> None:
@@ -2,10 +2,19 @@ from pathlib import Path
 from datetime import datetime
 from llama_cpp import Llama
 from common.constants_prod import DIR_MODELS
+from common.metrics import (PARSE_SECONDS, LLM_LOAD_SECONDS, LLM_PROMPT_TOKENS, LLM_COMPLETION_TOKENS,
+                            LLM_PREFILL_TPS, LLM_DECODE_TPS, LLM_JSON_FAILURES, merge_metrics, run_with_metrics)
+from common.keywords import KEYWORDS, PRODUCT
+from common.segmentation import RowSegmenter, SegmentRules
+from common.workbooks import find_name_column, iter_frames, iter_sheets, sheet_names
 import settings
 import os
 import json
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
 import pandas as pd
 
 
@@ -57,28 +66,53 @@ input_prompt = '''
 '''
 
 
+MODEL_NAME = "gemma-2-2b-it-IQ3_M.gguf"
+
+
 # НУЖНО Маленькая для OCR, 3Gb vram, с парсером работает збс!
 def extract_gemma_2_2b_it_IQ3_M(text, final_columns) -> dict:
     """
     Функция обрабатывает текст с помощью LLM модели Gemma 2, формирует корректный промпт,
     отправляет запрос и извлекает JSON-ответ.
     """
-    llm = Llama(
-        model_path=str(DIR_MODELS.joinpath("lmstudio-community", "gemma-2-2b-it-GGUF", "gemma-2-2b-it-IQ3_M.gguf")),
-        n_ctx=8192,
-        n_gpu_layers=-1,
-        verbose=False,
-    )
+    with LLM_LOAD_SECONDS.time():
+        llm = Llama(
+            model_path=str(DIR_MODELS.joinpath("lmstudio-community", "gemma-2-2b-it-GGUF", MODEL_NAME)),
+            n_ctx=8192,
+            n_gpu_layers=-1,
+            verbose=False,
+        )
     prompt = f"<start_of_turn>user\n{input_prompt}\n\nText:\n{text}\n\nJSON:<end_of_turn>\n<start_of_turn>model\n"
-    output = llm(
+    prompt_tokens = len(llm.tokenize(prompt.encode("utf-8")))
+
+    # Потоковая генерация: время до первого токена - prefill, остальное - decode (1 чанк = 1 токен)
+    start = time.perf_counter()
+    first_token_at = None
+    completion_tokens = 0
+    chunks = []
+    for chunk in llm(
         prompt=prompt,
         max_tokens=2048,
         temperature=0.0,
-        stop=["<end_of_turn>"]  # Останавливаем генерацию после ответа
-    )
+        stop=["<end_of_turn>"],  # Останавливаем генерацию после ответа
+        stream=True,
+    ):
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        completion_tokens += 1
+        chunks.append(chunk["choices"][0]["text"])
+    end = time.perf_counter()
+
+    LLM_PROMPT_TOKENS.inc(prompt_tokens, model=MODEL_NAME)
+    LLM_COMPLETION_TOKENS.inc(completion_tokens, model=MODEL_NAME)
+    if first_token_at is not None:
+        if first_token_at > start:
+            LLM_PREFILL_TPS.observe(prompt_tokens / (first_token_at - start), model=MODEL_NAME)
+        if completion_tokens > 1 and end > first_token_at:
+            LLM_DECODE_TPS.observe((completion_tokens - 1) / (end - first_token_at), model=MODEL_NAME)
 
     # Извлекаем текст и определяем только JSON-объект с помощью регулярного выражения
-    result_text = output["choices"][0]["text"].strip()
+    result_text = "".join(chunks).strip()
     match = re.search(r'\{.*\}', result_text, re.DOTALL)
     if match:
         result_text = match.group(0)
@@ -86,6 +120,7 @@ def extract_gemma_2_2b_it_IQ3_M(text, final_columns) -> dict:
     try:
         data = json.loads(result_text)
     except Exception as e:
+        LLM_JSON_FAILURES.inc(model=MODEL_NAME)
         print("Error parsing JSON:", e)
         print("Raw downloads:", result_text)
         data = {col: "не указано" for col in final_columns}
@@ -116,93 +151,156 @@ def append_df_to_excel(filename, df, sheet_name='Sheet1'):
         df.to_excel(filename, index=False, sheet_name=sheet_name)
 
 # НУЖНО (не)уникальный парсер excel
-class UnifiedExcelParser:
-    PRODUCT_NAMES = settings.product_names
+class ExcelRowRules(SegmentRules):
+    # Начала товаров считаются векторно в product_starts, здесь только раскладка результата
+    keep_head = True
+
 
-    def __init__(self, file_path):
+class UnifiedExcelParser:
+    def __init__(self, file_path, workers=None, engine=None):
         self.file_path = Path(file_path)
         self.data = []
+        # Сколько листов разбирать параллельно и каким движком читать книгу, по умолчанию из настроек
+        self.workers = settings.excel_sheet_workers if workers is None else workers
+        self.engine = engine
+        # Незакрытый товар текущего листа переходит из куска в кусок; строки до первого товара
+        # сохраняются отдельно (keep_head)
+        self.segmenter = RowSegmenter(ExcelRowRules())
 
     def is_product_name(self, text):
-        # Проверяет, начинается ли текст со слова из PRODUCT_NAMES
-        return any(text.lower().startswith(name.lower()) for name in self.PRODUCT_NAMES)
+        # Проверяет, начинается ли текст с названия товара
+        return KEYWORDS.starts_with_product_name(text)
 
     def contains_product_name(self, text):
-        # Обязательная проверка: текст должен содержать хотя бы одно слово из PRODUCT_NAMES
-        return any(name.lower() in text.lower() for name in self.PRODUCT_NAMES)
-
-    def detect_engine(self):
-        ext = self.file_path.suffix.lower()
-        if ext in ['.xlsx', '.xlsm']:
-            return 'openpyxl'
-        elif ext == '.xls':
-            return 'xlrd'
-        else:
-            return 'openpyxl'
+        # Обязательная проверка: текст должен содержать хотя бы одно название товара
+        return KEYWORDS.contains_product_name(text)
 
     def parse_excel(self):
+        # Все листы книги читаются потоково, строки идут в сегментацию кусками по EXCEL_CHUNK_ROWS
         if not self.file_path.exists():
             print(f"File not found: {self.file_path}")
             return
-        engine = self.detect_engine()
-        df = pd.read_excel(self.file_path, header=None, engine=engine)
-        if df.shape[1] == 1:
-            self.parse_single_column(df)
-        else:
-            name_column = None
-            for col in df.columns:
-                for row_idx in range(min(15, len(df))):
-                    cell_value = str(df.iloc[row_idx, col]).lower() if pd.notna(df.iloc[row_idx, col]) else ""
-# todo: переделать на проверку светильника, а не наименование (пиздец сt циклом for)
-                    if "наименование" in cell_value:
-                        name_column = col
-                        break
-                if name_column is not None:
-                    break
+        if self.workers > 1:
+            names = sheet_names(self.file_path, self.engine)
+            if len(names) > 1:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(names))) as executor:
+                    for data, values in executor.map(run_with_metrics, repeat(parse_sheet), repeat(self.file_path),
+                                                     names, repeat(self.engine)):
+                        merge_metrics(values)
+                        self.data.extend(data)
+                return
+        for _, rows in iter_sheets(self.file_path, engine=self.engine):
+            self.parse_frames(iter_frames(rows))
+
+    def parse_dataframe(self, df):
+        # Сегментация уже прочитанной таблицы; сюда же приходят товары doc/docx/pdf без промежуточного файла
+        self.parse_frames([df])
+
+    def parse_frames(self, frames):
+        """
+        Сегментация одного листа, прочитанного кусками.
+        Раскладка (одна колонка или колонка "наименование" с характеристиками справа)
+        определяется по первому куску, незакрытый товар переходит в следующий кусок.
+        """
+        width = name_column = None
+        for df in frames:
+            if df.empty:
+                continue
+            if width is None:
+                width = df.shape[1]
+                name_column = None if width == 1 else find_name_column(df)
             if name_column is None:
                 self.parse_single_column(df)
             else:
+                # Следующие куски могут быть шире первого (см. iter_frames)
                 extra_char = (name_column + 2 < df.shape[1])
                 self.parse_multi_column(df, name_column, extra_char)
+        self.close_segment()
+
+    @staticmethod
+    def normalize_column(column, tabs=True, newlines=False):
+        # str() каждой ячейки, как при построчном обходе, остальная обработка - сразу по всей колонке
+        column = column.map(str).str.strip()
+        if tabs:
+            column = column.str.replace("\t", " ", regex=False)
+        if newlines:
+            column = column.str.replace("\n", " ", regex=False)
+        return column
+
+    def collect_segments(self, pieces, starts):
+        """
+        pieces - текст строк таблицы, starts - маска строк, с которых начинается товар.
+        Маска считается векторно, границы товаров берутся из неё (RowSegmenter.feed_block);
+        последний товар остаётся открытым до следующего куска или конца листа.
+        """
+        bounds = np.flatnonzero(starts.to_numpy()).tolist()
+        self.add_segments(self.segmenter.feed_block(pieces.tolist(), bounds))
+
+    def close_segment(self):
+        self.add_segments(self.segmenter.close())
 
+    def add_segments(self, segments):
+        # Строки до первого товара, как и раньше, склеиваются с ведущим пробелом и попадают
+        # в результат, только если где-то внутри есть название товара; остальные товары
+        # начинаются с названия, поэтому проверять их не нужно
+        for segment in segments:
+            if segment.name is not None:
+                self.data.append({"text": segment.text})
+                continue
+            head = " " + segment.text
+            if self.contains_product_name(head):
+                self.data.append({"text": head})
+
+    def product_starts(self, names):
+        return names.str.lower().str.startswith(KEYWORDS.keywords_of(PRODUCT))
 
     def parse_single_column(self, df):
-        current_text = ""
-        for index, row in df.iterrows():
-            cell_value = str(row[0]).strip()
-            if self.is_product_name(cell_value):
-                if current_text and self.contains_product_name(current_text):
-                    self.data.append({"text": current_text})
-                current_text = cell_value
-            else:
-                current_text += " " + cell_value
-        if current_text and self.contains_product_name(current_text):
-            self.data.append({"text": current_text})
+        cells = self.normalize_column(df[0], tabs=False)
+        self.collect_segments(cells, self.product_starts(cells))
 
     def parse_multi_column(self, df, name_column, extra_char):
-        current_text = ""
-        for index, row in df.iterrows():
-            if pd.isna(row[name_column]):
-                continue
-            cell_value = str(row[name_column]).strip().replace("\t", " ")
-            char_value = ""
-            if extra_char:
-                if name_column + 1 < df.shape[1]:
-                    char_value += " " + str(row[name_column + 1]).strip().replace("\t", " ").replace("\n", " ")
-                if name_column + 2 < df.shape[1]:
-                    char_value += " " + str(row[name_column + 2]).strip().replace("\t", " ").replace("\n", " ")
-            else:
-                if name_column + 1 < df.shape[1]:
-                    char_value = " " + str(row[name_column + 1]).strip().replace("\t", " ").replace("\n", " ")
-            if self.is_product_name(cell_value):
-                if current_text and self.contains_product_name(current_text):
-                    self.data.append({"text": current_text})
-                current_text = cell_value + char_value
-            else:
-                current_text += " " + cell_value + char_value
-        if current_text and self.contains_product_name(current_text):
-            self.data.append({"text": current_text})
+        rows = df[df[name_column].notna()]
+        names = self.normalize_column(rows[name_column])
+        pieces = names
+        if extra_char:
+            pieces = (pieces + " " + self.normalize_column(rows[name_column + 1], newlines=True)
+                      + " " + self.normalize_column(rows[name_column + 2], newlines=True))
+        elif name_column + 1 < df.shape[1]:
+            pieces = pieces + " " + self.normalize_column(rows[name_column + 1], newlines=True)
+        self.collect_segments(pieces, self.product_starts(names))
 
     def process(self):
-        self.parse_excel()
+        with PARSE_SECONDS.time(parser=type(self).__name__):
+            self.parse_excel()
+
+
+def parse_sheet(file_path, sheet_name, engine=None):
+    # Разбор одного листа в отдельном процессе (settings.excel_sheet_workers > 1)
+    parser = UnifiedExcelParser(file_path, workers=1, engine=engine)
+    for _, rows in iter_sheets(parser.file_path, [sheet_name], engine):
+        parser.parse_frames(iter_frames(rows))
+    return parser.data
+
+
+if __name__ == "__main__":
+    import argparse
+    from common.profiling import Profiler
+    from pipeline import extract_product
+
+    arg_parser = argparse.ArgumentParser(description="Парсинг Excel и извлечение характеристик моделью")
+    arg_parser.add_argument("input_file", type=Path)
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="снять профиль этапов и сохранить его рядом с входным файлом")
+    args = arg_parser.parse_args()
+
+    profiler = Profiler(args.profile)
+    with profiler.stage("parse"):
+        parser = UnifiedExcelParser(args.input_file)
+        parser.process()
+
+    with profiler.stage("extract"):
+        for product in parser.data:
+            extract_product(product["text"])
 
+    for path in profiler.save(args.input_file.parent, args.input_file.stem):
+        print(f"Профиль сохранён: {path}")
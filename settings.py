@@ -5,4 +5,47 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # product_names = ["Светильник", "Прожектор", "Лампа", "Осветительный прибор", "Лам. ", "Фонарь", "Огонь заградительный"]
 product_names = ["Светильник", "Прожектор", "Лампа", "Осветительный прибор", "Лам. "]
 
-# При использовании ORM, зависимости портировать из виртуального окружения или настроек (решить)
\ No newline at end of file
+# При использовании ORM, зависимости портировать из виртуального окружения или настроек (решить)
+# Распределённый режим: путь к файлу SQLite-очереди на общем хранилище, ":local:" - очередь в памяти
+# веб-процесса, None - файлы обрабатываются прямо в веб-процессе
+job_queue_path = None
+# Порт /metrics отдельного воркера (worker.py): его метрики парсинга, модели и ожидания в очереди
+# не видны веб-процессу; None - не отдавать
+worker_metrics_port = None
+
+# Сохранять промежуточный файл с результатами парса doc/docx/pdf (только для отладки)
+save_intermediate_xlsx = False
+
+# Сколько листов Excel разбирать параллельно (в отдельных процессах); 1 - по очереди
+excel_sheet_workers = 1
+
+# Движок чтения Excel: "auto" (calamine, если установлен python-calamine, иначе openpyxl/xlrd),
+# "calamine", "openpyxl" или "xlrd"; если файл не открылся, пробуются остальные
+excel_reader_engine = "auto"
+
+# Процессов для извлечения таблиц из PDF по страницам; 0 - по числу ядер, 1 - без параллельности
+pdf_workers = 0
+
+# Предварительная проверка страниц PDF: поиск таблиц только там, где есть линии/рамки
+pdf_prescreen = True
+
+# Распознавание страниц PDF без текстового слоя (сканов) через Tesseract; нужны pytesseract и сам tesseract
+pdf_ocr = True
+# Языки Tesseract и путь к исполняемому файлу (None - искать в PATH)
+ocr_languages = "rus+eng"
+tesseract_cmd = None
+
+# Конвертация .doc в .docx: "auto" (Spire, если установлен, иначе LibreOffice), "spire" или "libreoffice";
+# если конвертер не справился, пробуются остальные
+doc_converter = "auto"
+# Постоянных процессов-конвертеров (прогретых при старте пула); 0 - конвертировать в текущем процессе
+doc_conversion_workers = 2
+# Путь к soffice (None - искать в PATH)
+libreoffice_cmd = None
+
+# Стратегия парсинга (parsers/strategy.py): "auto" - лучшая по оценке на выборке документа
+# или имя стратегии из реестра, например "uniqe_doc"; неподходящая по формату стратегия пропускается
+parser_strategy = "auto"
+# Процессов для оценки стратегий на выборке; 1 - по очереди в текущем процессе (выборка маленькая,
+# отдельный пул обычно дороже самой оценки), 0 - постоянный пул по числу ядер
+strategy_workers = 1
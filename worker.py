@@ -0,0 +1,98 @@
+import argparse
+import socket
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+
+from common.cache import ResultCache
+from common.conversion import get_conversion_service
+from common.constants import JOB_HEARTBEAT_SECONDS, JOB_LEASE_SECONDS
+from common.jobs import JobQueue, make_job_queue
+from common.metrics import QUEUE_WAIT_SECONDS, serve_metrics
+from pipeline import process_job
+import settings
+
+
+def heartbeat_loop(queue: JobQueue, job_id: str, worker_id: str, stop: threading.Event) -> None:
+    # Продлевает аренду задачи, пока она обрабатывается; при падении воркера аренда истечёт сама
+    while not stop.wait(JOB_HEARTBEAT_SECONDS):
+        if not queue.heartbeat(job_id, worker_id, JOB_LEASE_SECONDS):
+            print(f"Аренда задачи {job_id} потеряна")
+            return
+
+
+def run_worker(queue: JobQueue, worker_id: str, stop: threading.Event, poll_interval: float = 2.0) -> None:
+    """
+    Цикл воркера: берёт задачу из общей очереди, обрабатывает и пишет результат в общее хранилище.
+    Каталоги uploads/, downloads/ и cache/ должны быть общими для веб-узла и всех воркеров
+    (воркер запускается из каталога проекта, где они смонтированы).
+    """
+    result_cache = ResultCache()
+    get_conversion_service().start()
+    print(f"Воркер {worker_id} запущен")
+
+    while not stop.is_set():
+        job = queue.claim(worker_id, JOB_LEASE_SECONDS)
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+
+        print(f"Воркер {worker_id}: задача {job.job_id}, попытка {job.attempts}")
+        if job.attempts == 1:
+            QUEUE_WAIT_SECONDS.observe(time.time() - job.created_at)
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(target=heartbeat_loop, args=(queue, job.job_id, worker_id, heartbeat_stop),
+                                     daemon=True)
+        heartbeat.start()
+        try:
+            result = process_job(job.payload)
+            result_cache.put(job.payload["cache_key"], Path(result["output_file"]))
+            queue.complete(job.job_id, worker_id, result)
+            print(f"Воркер {worker_id}: задача {job.job_id} выполнена")
+
+        except Exception as e:
+            traceback.print_exc()
+            queue.fail(job.job_id, worker_id, str(e))
+
+        finally:
+            heartbeat_stop.set()
+            heartbeat.join()
+
+
+def start_local_worker(queue: JobQueue) -> threading.Event:
+    # Для очереди ":local:" воркер работает потоком внутри веб-процесса
+    stop = threading.Event()
+    worker_id = f"{socket.gethostname()}-local"
+    threading.Thread(target=run_worker, args=(queue, worker_id, stop), daemon=True).start()
+    return stop
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Воркер парсинга и извлечения товаров из общей очереди")
+    arg_parser.add_argument("--queue", default=settings.job_queue_path,
+                            help="путь к SQLite-очереди на общем хранилище")
+    arg_parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}")
+    arg_parser.add_argument("--metrics-port", type=int, default=settings.worker_metrics_port,
+                            help="порт /metrics воркера для Prometheus")
+    args = arg_parser.parse_args()
+
+    queue = make_job_queue(args.queue)
+    if queue is None:
+        arg_parser.error("не задан путь к очереди (--queue или settings.job_queue_path)")
+
+    # Метрики воркера (ожидание в очереди, парсинг, модель, запись Excel) записываются в его процессе
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    # Незавершённая при остановке задача вернётся в очередь по истечении аренды
+    try:
+        run_worker(queue, args.worker_id, threading.Event())
+
+    except KeyboardInterrupt:
+        print(f"Воркер {args.worker_id} остановлен")
+
+
+if __name__ == "__main__":
+    main()